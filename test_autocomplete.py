@@ -41,6 +41,21 @@ def test_autocomplete(query):
         print(f"Error testing autocomplete: {e}")
         return []
 
+def test_accented_author(accented, plain):
+    """An accented author name must be suggested for both spellings of the query"""
+    authors = {}
+    for query in (accented, plain):
+        suggestions = test_autocomplete(query)
+        authors[query] = sorted(s['text'] for s in suggestions if s.get('type') == 'author')
+    if not authors[accented]:
+        print(f"No author suggestions for '{accented}' (is such an author in the library?)")
+        return False
+    if authors[accented] != authors[plain]:
+        print(f"Mismatch: '{accented}' -> {authors[accented]}, '{plain}' -> {authors[plain]}")
+        return False
+    print(f"Accented author OK: {authors[accented]}")
+    return True
+
 def main():
     """Main test function"""
     print("Testing autocomplete functionality...")
@@ -61,6 +76,11 @@ def main():
         print(f"\nTesting query: '{query}'")
         suggestions = test_autocomplete(query)
         print(f"Found {len(suggestions)} suggestions")
+    
+    # Accented authors are stored as escaped JSON (\u00c9mile) but must still match
+    print("\n3. Testing accented author names...")
+    for accented, plain in [('émile', 'emile'), ('céline', 'celine')]:
+        test_accented_author(accented, plain)
 
 if __name__ == '__main__':
     main()
@@ -8,7 +8,7 @@ This version uses a modular architecture with clear separation of concerns.
 
 import os
 import sys
-from flask import Flask
+from flask import Flask, g, request
 import shutil
 
 # Add src to path for imports
@@ -66,6 +66,9 @@ def create_app(config_name='default'):
 
     # Register context processors
     register_context_processors(app)
+
+    # Register per-request hooks
+    register_request_hooks(app)
     
     # Register routes
     register_routes(app)
@@ -323,9 +326,9 @@ def register_context_processors(app):
 
         # Build complete tag maps that include all tags visible in catalog filters (genres + topics)
         try:
-            # Start with existing maps
-            labels_en = get_tag_labels_map('en')
-            labels_fr = get_tag_labels_map('fr')
+            # Start with copies of the shared maps (extended below)
+            labels_en = dict(get_tag_labels_map('en'))
+            labels_fr = dict(get_tag_labels_map('fr'))
             colors = get_tag_colors_map()
 
             # Gather all dynamic tags from the catalogue filters
@@ -382,6 +385,14 @@ def register_context_processors(app):
             ctx['favicon_version'] = '1'
         return ctx
 
+
+def register_request_hooks(app):
+    """Register before_request hooks"""
+    @app.before_request
+    def resolve_tag_language():
+        # Language for tag labels in service responses, resolved once per request
+        g.tag_lang = request.args.get('lang') or request.headers.get('X-Language') or 'en'
+
 # Create the application instance
 app = create_app()
 
@@ -0,0 +1,339 @@
+"""
+Derived, query-friendly book columns maintained by the webapp.
+
+The indexer (src/database.py) owns the `books` table and writes raw
+metadata. The webapp keeps a few derived columns next to it so that hot
+read paths can be answered by SQLite instead of Python loops over every
+row (e.g. accent-folded copies of title/authors/description for search),
+plus a `book_tags` table with one row per book tag for catalog filters,
+the tags shown on the book card (`primary_tag`, `secondary_tags`), a
+stable `random_key` per book for shuffled catalog paging, and a `books_fts`
+full-text index over the normalised title/authors for autocomplete.
+
+Every derived row is stamped with `derived_version`. The indexer's
+INSERT OR REPLACE leaves that column NULL, so re-indexed books (and rows
+derived by an older version of this module) are recomputed on the next
+`sync_derived_fields` run: at startup, after each database reload, and
+before searches (`sync_pending_rows`) so rows the indexer wrote into a live
+database without a reload are still found.
+"""
+
+import json
+import random
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import event, text
+
+try:
+    from .models import db, Book, safe_json_loads
+    from .utils import normalize_for_search, json_loads
+except ImportError:
+    from models import db, Book, safe_json_loads
+    from utils import normalize_for_search, json_loads
+
+
+# Bump whenever derive_fields()/derive_tags() change so existing rows get recomputed
+DERIVED_VERSION = 7
+
+# Number of tags shown on a book card (primary + secondaries)
+DISPLAYED_TAGS = 4
+
+# Raw columns derive_fields()/derive_tags() read
+SOURCE_COLUMNS = ('id', 'title', 'authors', 'description', 'tag_scores', 'topics', 'random_key')
+
+# Derived columns added to `books` when missing: name -> SQLite type
+DERIVED_COLUMNS: Dict[str, str] = {
+    'title_norm': 'TEXT',
+    'authors_norm': 'TEXT',
+    'description_norm': 'TEXT',
+    'derived_version': 'INTEGER',
+    'random_key': 'REAL',
+    'primary_tag': 'TEXT',
+    'primary_tag_score': 'REAL',
+    # JSON array of {"tag", "score"} for the secondary card tags (score null for topics)
+    'secondary_tags': 'TEXT',
+}
+
+TABLES = (
+    # One row per (book, tag); is_displayed marks the tags shown on the book card
+    """CREATE TABLE IF NOT EXISTS book_tags (
+        book_id TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        score REAL,
+        is_displayed INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (book_id, tag)
+    )""",
+)
+
+# Full-text index for autocomplete, keyed by books.rowid. Rewritten here rather
+# than by triggers: the indexer's INSERT OR REPLACE deletes without firing
+# delete triggers, and the *_norm columns are only filled in by this module.
+FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title_norm, authors_norm, tokenize='unicode61 remove_diacritics 2')"
+)
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_books_title_norm ON books(title_norm COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_books_derived_version ON books(derived_version)",
+    "CREATE INDEX IF NOT EXISTS idx_books_random_key ON books(random_key)",
+    "CREATE INDEX IF NOT EXISTS idx_books_primary_tag ON books(primary_tag)",
+    "CREATE INDEX IF NOT EXISTS idx_book_tags_tag ON book_tags(tag, book_id)",
+    # Covering index for catalog tag filters and the genre list (displayed tags only)
+    "CREATE INDEX IF NOT EXISTS idx_book_tags_displayed ON book_tags(tag, book_id) WHERE is_displayed = 1",
+)
+
+
+# Serialises on-demand syncs between request threads
+_sync_lock = threading.Lock()
+
+# Changes whenever book tags may have changed; cache key for tag/topic lists
+_tags_version = 0
+
+
+def tags_version() -> int:
+    """Current book tags version (compare with a cached value to detect changes)."""
+    return _tags_version
+
+
+def bump_tags_version() -> None:
+    global _tags_version
+    _tags_version += 1
+
+
+def derive_fields(values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Compute derived column values from a row's raw columns."""
+    card = _ranked_tags(values)[:DISPLAYED_TAGS]
+    return {
+        'title_norm': normalize_for_search(values.get('title') or ''),
+        # Decoded names: the indexer stores authors as ASCII-escaped JSON (\u00c9mile)
+        'authors_norm': normalize_for_search(' '.join(safe_json_loads(values.get('authors')))),
+        'description_norm': normalize_for_search(values.get('description') or ''),
+        'derived_version': DERIVED_VERSION,
+        # Uniform in [0, 1); kept once assigned so the shuffled order is stable
+        'random_key': values.get('random_key') if values.get('random_key') is not None else random.random(),
+        # '' rather than NULL so "derived, no tags" differs from "not derived yet"
+        'primary_tag': card[0][0] if card else '',
+        'primary_tag_score': card[0][1] if card else None,
+        'secondary_tags': json.dumps([{'tag': t, 'score': sc} for t, sc in card[1:]]),
+    }
+
+
+def _parse_tag_scores(raw) -> list:
+    if isinstance(raw, list):
+        return raw
+    if not raw:
+        return []
+    try:
+        parsed = json_loads(raw)
+    except Exception:
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def _ranked_tags(values: Mapping[str, Any]) -> List[Tuple[str, Optional[float]]]:
+    """A book's tags as (tag, score), best first; the first DISPLAYED_TAGS go on the card.
+
+    Non-zero tag_scores sorted by score; books without tag_scores fall back
+    to their ordered topics (no scores).
+    """
+    tag_scores = _parse_tag_scores(values.get('tag_scores'))
+    if not tag_scores:
+        return [(str(t), None) for t in safe_json_loads(values.get('topics')) if t]
+
+    scored = []
+    for d in tag_scores:
+        if isinstance(d, dict) and 'tag' in d:
+            try:
+                score = float(d.get('score', 0.0))
+            except Exception:
+                continue
+            if score > 0:
+                scored.append((str(d['tag']), score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+
+def derive_tags(values: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Compute book_tags rows ({tag, score, is_displayed}) from a row's raw columns."""
+    ranked = _ranked_tags(values)
+    shown = {tag for tag, _ in ranked[:DISPLAYED_TAGS]}
+    rows: Dict[str, Dict[str, Any]] = {}
+    for tag, score in ranked:
+        # Ranked best first, so the first occurrence of a duplicate tag is its best score
+        if tag and tag not in rows:
+            rows[tag] = {'tag': tag, 'score': score, 'is_displayed': tag in shown}
+    return list(rows.values())
+
+
+def _replace_book_tags(conn, book_ids: List[str], tag_rows: List[Dict[str, Any]]) -> None:
+    conn.execute(text("DELETE FROM book_tags WHERE book_id = :id"), [{'id': i} for i in book_ids])
+    if tag_rows:
+        conn.execute(text(
+            "INSERT INTO book_tags (book_id, tag, score, is_displayed) "
+            "VALUES (:book_id, :tag, :score, :is_displayed)"
+        ), tag_rows)
+
+
+def _replace_book_fts(conn, book_ids: List[str]) -> None:
+    if not _has_fts(conn):
+        return
+    params = [{'id': i} for i in book_ids]
+    conn.execute(text("DELETE FROM books_fts WHERE rowid = (SELECT rowid FROM books WHERE id = :id)"), params)
+    conn.execute(text(
+        "INSERT INTO books_fts (rowid, title_norm, authors_norm) "
+        "SELECT rowid, title_norm, authors_norm FROM books WHERE id = :id"
+    ), params)
+
+
+def _has_fts(conn) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+    )).first() is not None
+
+
+def ensure_schema(conn) -> bool:
+    """Add missing derived columns and indexes. Returns False if there is no books table."""
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_info(books)"))}
+    if not existing:
+        return False
+    for name, col_type in DERIVED_COLUMNS.items():
+        if name not in existing:
+            try:
+                conn.execute(text(f"ALTER TABLE books ADD COLUMN {name} {col_type}"))
+            except Exception:
+                # Another worker migrating the same file may have added it first
+                if name not in {row[1] for row in conn.execute(text("PRAGMA table_info(books)"))}:
+                    raise
+    for ddl in TABLES + INDEXES:
+        conn.execute(text(ddl))
+    try:
+        conn.execute(text(FTS_TABLE))
+    except Exception:
+        # SQLite built without FTS5: autocomplete falls back to LIKE on the *_norm columns
+        pass
+    return True
+
+
+def sync_derived_fields(conn, batch_size: int = 500) -> int:
+    """Recompute derived columns for rows that are missing or outdated. Returns rows updated."""
+    select_stale = text(
+        f"SELECT {', '.join(SOURCE_COLUMNS)} FROM books "
+        "WHERE derived_version IS NULL OR derived_version < :version LIMIT :limit"
+    )
+    update = None
+    updated = 0
+    while True:
+        rows = conn.execute(select_stale, {'version': DERIVED_VERSION, 'limit': batch_size}).mappings().all()
+        if not rows:
+            break
+        params = []
+        tag_rows = []
+        for row in rows:
+            values = derive_fields(row)
+            values['id'] = row['id']
+            params.append(values)
+            tag_rows.extend(dict(t, book_id=row['id']) for t in derive_tags(row))
+        if update is None:
+            assignments = ', '.join(f"{k} = :{k}" for k in params[0] if k != 'id')
+            update = text(f"UPDATE books SET {assignments} WHERE id = :id")
+        conn.execute(update, params)
+        _replace_book_tags(conn, [p['id'] for p in params], tag_rows)
+        _replace_book_fts(conn, [p['id'] for p in params])
+        updated += len(params)
+    if updated:
+        # Drop tags and index entries of books that no longer exist
+        conn.execute(text("DELETE FROM book_tags WHERE book_id NOT IN (SELECT id FROM books)"))
+        if _has_fts(conn):
+            conn.execute(text("DELETE FROM books_fts WHERE rowid NOT IN (SELECT rowid FROM books)"))
+    return updated
+
+
+def sync_pending_rows() -> int:
+    """Derive rows written since the last sync, through the current session. Returns rows updated.
+
+    Costs one indexed probe when every row is current.
+    """
+    probe = text("SELECT 1 FROM books WHERE derived_version IS NULL OR derived_version < :version LIMIT 1")
+    if db.session.execute(probe, {'version': DERIVED_VERSION}).first() is None:
+        return 0
+    with _sync_lock:
+        try:
+            count = sync_derived_fields(db.session.connection())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    if count:
+        bump_tags_version()
+    return count
+
+
+def migrate_book_index(engine) -> Optional[int]:
+    """Migrate and sync the books table behind `engine`. Returns rows updated, None if no books table."""
+    with engine.begin() as conn:
+        if not ensure_schema(conn):
+            return None
+    with engine.begin() as conn:
+        return sync_derived_fields(conn)
+
+
+def init_book_index(app) -> bool:
+    """Migrate the books table and bring derived columns up to date.
+
+    Book maps the derived columns unconditionally, so failing to add them
+    (read-only or locked database file) is fatal rather than leaving every
+    query failing with "no such column". A failed sync only leaves some
+    derived values stale and is logged.
+    """
+    with app.app_context():
+        try:
+            with db.engine.begin() as conn:
+                if not ensure_schema(conn):
+                    return False
+        except Exception as e:
+            raise RuntimeError(f"Could not add derived book columns: {e}") from e
+        try:
+            with db.engine.begin() as conn:
+                count = sync_derived_fields(conn)
+        except Exception as e:
+            app.logger.warning("Could not sync derived book fields: %s", e)
+            return False
+    # Runs at startup and after each reload, i.e. whenever the indexer may have written
+    bump_tags_version()
+    if count:
+        app.logger.info("Derived book fields updated for %d rows", count)
+    return True
+
+
+@event.listens_for(Book, 'before_insert')
+@event.listens_for(Book, 'before_update')
+def _derive_on_write(mapper, connection, target) -> None:
+    """Keep derived columns current for books written through the ORM."""
+    values = {c: getattr(target, c, None) for c in SOURCE_COLUMNS}
+    for key, value in derive_fields(values).items():
+        setattr(target, key, value)
+
+
+@event.listens_for(Book, 'after_insert')
+@event.listens_for(Book, 'after_update')
+def _sync_tags_on_write(mapper, connection, target) -> None:
+    """Rewrite book_tags rows and the full-text entry for books written through the ORM."""
+    values = {c: getattr(target, c, None) for c in SOURCE_COLUMNS}
+    tag_rows = [dict(t, book_id=target.id) for t in derive_tags(values)]
+    _replace_book_tags(connection, [target.id], tag_rows)
+    _replace_book_fts(connection, [target.id])
+    bump_tags_version()
+
+
+@event.listens_for(Book, 'before_delete')
+def _drop_index_on_delete(mapper, connection, target) -> None:
+    """Remove book_tags rows and the full-text entry of books deleted through the ORM."""
+    _replace_book_tags(connection, [target.id], [])
+    if _has_fts(connection):
+        connection.execute(
+            text("DELETE FROM books_fts WHERE rowid = (SELECT rowid FROM books WHERE id = :id)"),
+            {'id': target.id},
+        )
+    bump_tags_version()
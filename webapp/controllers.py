@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from flask import (
     Flask, render_template, request, jsonify, redirect, 
-    url_for, Response, current_app, session, abort
+    url_for, Response, current_app, session, abort, send_file
 )
 from sqlalchemy import text
 
@@ -201,6 +201,21 @@ def register_routes(app: Flask):
         selected_genres = _parse_multi('genre')
         selected_topics = _parse_multi('topic')
 
+        # Keyset pagination: pass cursor= (empty for the first page), then next_cursor
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            books_list, next_cursor = BookService.get_books_after_cursor(
+                cursor=cursor,
+                per_page=max(1, per_page),
+                search=search,
+                genres=selected_genres,
+                topics=selected_topics,
+            )
+            return jsonify({
+                'books': books_list,
+                'next_cursor': next_cursor
+            })
+
         books_list, total, pages = BookService.get_books_with_filters(
             search=search,
             genres=selected_genres,
@@ -298,7 +313,14 @@ def register_routes(app: Flask):
     def book_cover(book_id):
         """Serve book cover image"""
         try:
-            cover_data = CoverService.get_cover_data(book_id)
+            try:
+                cover_file = CoverService.get_cover_file(book_id)
+            except OSError:
+                # Cover cache not writable: serve the decoded bytes from the database
+                cover_file = None
+                cover_data = CoverService.get_cover_data(book_id)
+            else:
+                cover_data = cover_file
 
             if not cover_data:
                 # Generate a clean, readable SVG placeholder as default cover
@@ -358,6 +380,13 @@ def register_routes(app: Flask):
                 response.headers['Cache-Control'] = 'public, max-age=86400'
                 return response
 
+            if cover_file:
+                # Streamed from the file cache (sendfile where available), with ETag/304 support
+                path, mime_type = cover_file
+                response = send_file(path, mimetype=mime_type, conditional=True)
+                response.headers['Cache-Control'] = 'public, max-age=31536000'  # Cache for 1 year
+                return response
+
             image_data, mime_type = cover_data
 
             # Create response with proper headers
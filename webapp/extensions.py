@@ -12,8 +12,10 @@ from flask_session import Session
 
 try:
     from .models import db
+    from .book_index import init_book_index, migrate_book_index, bump_tags_version
 except ImportError:
     from models import db
+    from book_index import init_book_index, migrate_book_index, bump_tags_version
 
 
 class DatabaseReloader:
@@ -61,6 +63,22 @@ class DatabaseReloader:
     
     def reload_database(self) -> bool:
         """Reload database connection"""
+        try:
+            # Re-indexed rows come back without derived columns (or without the
+            # columns at all): migrate and sync the new file on its own engine
+            # first, while requests keep using the existing pooled connections
+            staging = create_engine(current_app.config['SQLALCHEMY_DATABASE_URI'])
+            try:
+                migrate_book_index(staging)
+            finally:
+                staging.dispose()
+        except Exception as e:
+            # Keep serving from the current connections. should_reload() already
+            # recorded this mtime, so the next attempt waits for the file to change
+            # again instead of retrying a failing migration on every check
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Database reload failed: {e}")
+            return False
+
         try:
             # Close existing connections
             db.session.close()
@@ -75,6 +93,8 @@ class DatabaseReloader:
         except Exception as e:
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Database reload failed: {e}")
             return False
+        finally:
+            bump_tags_version()
 
 
 def init_extensions(app: Flask):
@@ -94,6 +114,9 @@ def init_extensions(app: Flask):
     except Exception:
         # Non-fatal: continue without indexes if creation fails
         pass
+
+    # Add/refresh derived search and tag columns used by the services
+    init_book_index(app)
     
     # Initialize Flask-Session
     Session(app)
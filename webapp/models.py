@@ -8,6 +8,11 @@ from typing import Dict, List, Optional
 import re
 from flask_sqlalchemy import SQLAlchemy
 
+try:
+    from .utils import json_loads
+except ImportError:
+    from utils import json_loads
+
 db = SQLAlchemy()
 
 def safe_json_loads(value):
@@ -28,7 +33,7 @@ def safe_json_loads(value):
     
     try:
         # First, try to parse as regular JSON
-        parsed = json.loads(value_str)
+        parsed = json_loads(value_str)
         if isinstance(parsed, list):
             return [str(item) for item in parsed]
         else:
@@ -42,7 +47,7 @@ def safe_json_loads(value):
         if value_str.startswith('"') and value_str.endswith('"'):
             # Remove outer quotes and unescape
             cleaned_value = value_str[1:-1].replace('\\"', '"')
-            parsed = json.loads(cleaned_value)
+            parsed = json_loads(cleaned_value)
             if isinstance(parsed, list):
                 return [str(item) for item in parsed]
             else:
@@ -54,6 +59,63 @@ def safe_json_loads(value):
     return [value_str] if value_str else []
 
 
+def _canonical_author_key(name: str) -> str:
+    if not name:
+        return ''
+    name = name.strip()
+    # If in "LAST, First" form, convert to "First Last" for keying
+    if ',' in name:
+        last, first = [part.strip() for part in name.split(',', 1)]
+        name = f"{first} {last}"
+    # Lowercase and strip all non-alphanumeric for robust matching
+    name = name.lower()
+    return re.sub(r'[^a-z0-9]+', '', name)
+
+
+def _display_author_name(name: str) -> str:
+    if not name:
+        return ''
+    name = name.strip()
+    # Prefer "First Last" display
+    if ',' in name:
+        last, first = [part.strip() for part in name.split(',', 1)]
+        name = f"{first} {last}"
+    # Collapse extra whitespace
+    name = ' '.join(name.split())
+    # Title-case for nicer display (best-effort)
+    return name.title()
+
+
+def display_author_list(value) -> List[str]:
+    """Parse a stored authors value into display names, deduplicated"""
+    seen_keys = set()
+    authors_list: List[str] = []
+    for author in safe_json_loads(value):
+        display = _display_author_name(str(author))
+        key = _canonical_author_key(display)
+        if display and key not in seen_keys:
+            seen_keys.add(key)
+            authors_list.append(display)
+    return authors_list
+
+
+def card_tags(primary_tag: Optional[str], primary_tag_score: Optional[float],
+              secondary_tags: Optional[str]) -> Dict:
+    """Card tag fields from the columns book_index materializes (primary_tag None until derived)."""
+    if primary_tag is None:
+        return {'primary_tag': None}
+    try:
+        secondaries = json_loads(secondary_tags) if secondary_tags else []
+    except (json.JSONDecodeError, TypeError):
+        secondaries = []
+    return {
+        'primary_tag': primary_tag,
+        'primary_tag_score': primary_tag_score,
+        'secondary_tags': [d['tag'] for d in secondaries],
+        'secondary_tags_scored': [d for d in secondaries if d.get('score') is not None],
+    }
+
+
 class Book(db.Model):
     """Book model for the database"""
     __tablename__ = 'books'
@@ -89,50 +151,24 @@ class Book(db.Model):
     cover_mime_type = db.Column(db.String(100))
     cover_file_name = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Written by the indexer as ISO-8601 text (not parsed as a DateTime)
+    updated_at = db.Column(db.String)
+    # Derived columns maintained by book_index (not part of the indexer schema)
+    title_norm = db.Column(db.Text)
+    authors_norm = db.Column(db.Text)
+    description_norm = db.deferred(db.Column(db.Text))
+    derived_version = db.Column(db.Integer)
+    random_key = db.Column(db.Float)
+    primary_tag = db.Column(db.Text)
+    primary_tag_score = db.Column(db.Float)
+    secondary_tags = db.Column(db.Text)
     
     def to_dict(self) -> Dict:
         """Convert book to dictionary"""
-        # Normalize and deduplicate authors for consistent display
-        raw_authors = safe_json_loads(self.authors)
-
-        def _canonical_author_key(name: str) -> str:
-            if not name:
-                return ''
-            name = name.strip()
-            # If in "LAST, First" form, convert to "First Last" for keying
-            if ',' in name:
-                last, first = [part.strip() for part in name.split(',', 1)]
-                name = f"{first} {last}"
-            # Lowercase and strip all non-alphanumeric for robust matching
-            name = name.lower()
-            return re.sub(r'[^a-z0-9]+', '', name)
-
-        def _display_author_name(name: str) -> str:
-            if not name:
-                return ''
-            name = name.strip()
-            # Prefer "First Last" display
-            if ',' in name:
-                last, first = [part.strip() for part in name.split(',', 1)]
-                name = f"{first} {last}"
-            # Collapse extra whitespace
-            name = ' '.join(name.split())
-            # Title-case for nicer display (best-effort)
-            return name.title()
-
-        seen_keys = set()
-        authors_list: List[str] = []
-        for author in raw_authors:
-            display = _display_author_name(str(author))
-            key = _canonical_author_key(display)
-            if display and key not in seen_keys:
-                seen_keys.add(key)
-                authors_list.append(display)
-
         return {
             'id': self.id,
             'title': self.title,
-            'authors': authors_list,
+            'authors': display_author_list(self.authors),
             'language': self.language,
             'publisher': self.publisher,
             'publication_date': self.publication_date,
@@ -156,13 +192,18 @@ class Book(db.Model):
             'topics': safe_json_loads(self.topics),
             'keywords': safe_json_loads(self.keywords),
             # Unified tag scores for UI derivation (preserve list of dicts)
-            'tag_scores': (json.loads(self.tag_scores) if self.tag_scores else []),
+            'tag_scores': (json_loads(self.tag_scores) if self.tag_scores else []),
+            # Card tags materialized by book_index (primary_tag is None until derived)
+            **self._card_tags(),
             'cover_data': self.cover_data,
             'cover_mime_type': self.cover_mime_type,
             'cover_file_name': self.cover_file_name,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
+    def _card_tags(self) -> Dict:
+        return card_tags(self.primary_tag, self.primary_tag_score, self.secondary_tags)
+
     @property
     def reading_time(self) -> Optional[str]:
         """Calculate estimated reading time"""
@@ -196,3 +237,14 @@ class Book(db.Model):
     def keyword_list(self) -> List[str]:
         """Get list of keywords"""
         return safe_json_loads(self.keywords)
+
+
+class BookTag(db.Model):
+    """Tag of a book, derived from tag_scores/topics by book_index"""
+    __tablename__ = 'book_tags'
+
+    book_id = db.Column(db.String(32), primary_key=True)
+    tag = db.Column(db.String(100), primary_key=True)
+    score = db.Column(db.Float)
+    # True for the tags shown on the book card (primary + secondaries)
+    is_displayed = db.Column(db.Boolean, nullable=False, default=False)
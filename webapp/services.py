@@ -2,25 +2,309 @@
 Business logic and data processing services for the library webapp
 """
 
-from typing import Dict, List, Optional, Tuple
+import base64
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 import random
-from sqlalchemy import text, or_
+from sqlalchemy import text, or_, select, func, bindparam, literal_column
 import time
-from flask import current_app
+from flask import current_app, g
 
 try:
-    from .models import db, Book
-    from .utils import calculate_reading_time, get_genre_color, normalize_characters
+    from .models import db, Book, BookTag, safe_json_loads, card_tags, display_author_list
+    from .book_index import tags_version, sync_pending_rows
+    from .tag_manager import get_tag_label, get_tag_labels_map
+    from .utils import calculate_reading_time, get_genre_color, normalize_for_search, json_loads
 except ImportError:
-    from models import db, Book
-    from utils import calculate_reading_time, get_genre_color, normalize_characters
+    from models import db, Book, BookTag, safe_json_loads, card_tags, display_author_list
+    from book_index import tags_version, sync_pending_rows
+    from tag_manager import get_tag_label, get_tag_labels_map
+    from utils import calculate_reading_time, get_genre_color, normalize_for_search, json_loads
+
+try:
+    # RapidFuzz stops computing as soon as a score cannot reach the cutoff
+    from rapidfuzz import fuzz as _fuzz
+
+    def _similarity(a: str, b: str, cutoff: float = 0.0) -> float:
+        """Similarity ratio in [0, 1]; scores below ``cutoff`` are reported as 0."""
+        return _fuzz.ratio(a, b, score_cutoff=cutoff * 100) / 100.0
+except ImportError:  # pragma: no cover
+    from difflib import SequenceMatcher
+
+    def _similarity(a: str, b: str, cutoff: float = 0.0) -> float:
+        """Similarity ratio in [0, 1]; scores below ``cutoff`` are reported as 0."""
+        ratio = SequenceMatcher(a=a, b=b).ratio()
+        return ratio if ratio >= cutoff else 0.0
+
+try:
+    # Optional persistent store so external rating lookups survive restarts
+    import diskcache as _diskcache
+except ImportError:  # pragma: no cover
+    _diskcache = None
+
+try:
+    # Optional incremental parser for responses where only the first match matters
+    import ijson as _ijson
+except ImportError:  # pragma: no cover
+    _ijson = None
+
+# Marks "nothing cached" (as opposed to a cached negative result)
+_UNSET = object()
+
+# Everything that is not a digit, stripped from ISBNs in one C-level pass
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# Punctuation and underscores (everything str.isalnum/isspace would reject)
+_NON_WORD_RE = re.compile(r'[^\w\s]|_')
+
+@lru_cache(maxsize=4096)
+def _parse_authors(raw: str) -> Tuple[str, ...]:
+    """Authors column value as a tuple of names, cached by the raw string."""
+    return tuple(safe_json_loads(raw)) if raw else ()
+
+
+_COMMA_RE = re.compile(r'\s*,\s*')
+
+
+@lru_cache(maxsize=8192)
+def _pretty_author_name(name: str) -> str:
+    """Pretty format an author string like "LAST, First" -> "First LAST"."""
+    pretty = (name or '').strip()
+    if not pretty:
+        return pretty
+    if ',' in pretty:
+        last, first = _COMMA_RE.split(pretty, 1)
+        pretty = f"{first} {last}"
+    # Collapse extra spaces and Title Case for first names, preserve last name capitalization
+    parts = pretty.split()
+    if not parts:
+        return pretty
+    if len(parts) == 1:
+        return parts[0].title()
+    first_names = ' '.join(parts[:-1]).title()
+    last_name = parts[-1]
+    return f"{first_names} {last_name}"
+
+
+# Search terms as the FTS5 unicode61 tokenizer sees them (letters and digits)
+_SEARCH_TERM_RE = re.compile(r'[^\W_]+')
+
+
+@lru_cache(maxsize=4096)
+def _norm_text(s: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace for fuzzy title/author matching."""
+    return ' '.join(_NON_WORD_RE.sub('', (s or '').strip().lower()).split())
+
+
+# Book metadata spells languages many ways; external APIs want ISO 639-1
+_LANG_MAP = {
+    'english': 'en', 'eng': 'en',
+    'french': 'fr', 'francais': 'fr', 'français': 'fr', 'fre': 'fr', 'fra': 'fr',
+    'german': 'de', 'deutsch': 'de', 'ger': 'de', 'deu': 'de',
+    'spanish': 'es', 'español': 'es', 'spa': 'es',
+    'italian': 'it', 'italiano': 'it', 'ita': 'it',
+    'portuguese': 'pt', 'por': 'pt',
+    'dutch': 'nl', 'dut': 'nl', 'nld': 'nl',
+}
+_LANG_TAG_RE = re.compile(r'^([a-z]{2})(?:[-_][a-z0-9]+)*$')
 
 
-# Simple in-memory caches for filters
+def _normalize_language(language: str) -> str:
+    """Map a free-form language value ('English', 'eng', 'en-US') to a 2-letter code, or ''."""
+    lang = (language or '').strip().lower()
+    if not lang:
+        return ''
+    mapped = _LANG_MAP.get(lang)
+    if mapped:
+        return mapped
+    m = _LANG_TAG_RE.match(lang)
+    return m.group(1) if m else ''
+
+
+# Cap concurrent requests per external API host so parallel lookups stay polite
+_HOST_CONCURRENCY = 4
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Return the semaphore guarding requests to the host of url."""
+    from urllib.parse import urlsplit
+    host = urlsplit(url).netloc
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = _host_semaphores[host] = threading.BoundedSemaphore(_HOST_CONCURRENCY)
+    return sem
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally (use with escape='\\')."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _sync_search_columns() -> None:
+    """Derive the *_norm columns of rows the indexer added since the last reload.
+
+    Search filters on those columns only; a failed sync just leaves new rows
+    out of the results.
+    """
+    try:
+        sync_pending_rows()
+    except Exception as e:
+        current_app.logger.warning("Could not sync derived book fields: %s", e)
+
+
+def _discovery_seed() -> float:
+    """Start point in [0, 1) on the random_key ring; changes once a day."""
+    return random.Random(date.today().toordinal()).random()
+
+
+def _encode_cursor(segment: int, last_key) -> str:
+    """Opaque catalog cursor: segment (see _catalog_segments) and last key seen.
+
+    The key is a random_key float in the keyed segments and a book id in
+    the last one (books not given a random_key yet).
+    """
+    if last_key is None:
+        key = ''
+    elif segment < 2:
+        key = repr(float(last_key))
+    else:
+        key = str(last_key)
+    raw = f"{segment}:{key}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: Optional[str]) -> Tuple[int, Optional[object]]:
+    """Inverse of _encode_cursor; a missing or malformed cursor starts from the top."""
+    if not cursor:
+        return 0, None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        segment, _, key = raw.partition(':')
+        segment = min(max(int(segment), 0), 3)
+        if not key:
+            return segment, None
+        return segment, (float(key) if segment < 2 else key)
+    except Exception:
+        return 0, None
+
+
+def _catalog_segments(query, seed: float) -> list:
+    """The shuffled catalog order as (query, sort column) segments, read in turn.
+
+    The random_key ring from the seed ([seed, 1) then [0, seed)), then the
+    books the indexer added but book_index has not given a key yet (NULL),
+    by id. Page-based and cursor paging both read these same segments.
+    """
+    return [
+        (query.filter(Book.random_key >= seed), Book.random_key),
+        (query.filter(Book.random_key < seed), Book.random_key),
+        (query.filter(Book.random_key.is_(None)), Book.id),
+    ]
+
+
+# Rendered exactly as the idx_book_tags_displayed partial index predicate
+# (is_displayed = 1) so SQLite can answer tag lookups from that index alone
+_TAG_DISPLAYED = BookTag.is_displayed == literal_column('1')
+
+# Columns a catalog card needs; notably not cover_data, served by /cover/<id>
+_CARD_COLUMNS = (
+    Book.id, Book.title, Book.authors, Book.language, Book.description,
+    Book.word_count, Book.reading_level, Book.primary_genre, Book.secondary_genres,
+    Book.primary_tag, Book.primary_tag_score, Book.secondary_tags,
+    Book.tag_scores, Book.topics, Book.random_key,
+)
+
+
+def _row_to_card_dict(row) -> Dict:
+    """Catalog card dict from a _CARD_COLUMNS row: the subset of Book.to_dict the cards render."""
+    card = {
+        'id': row.id,
+        'title': row.title,
+        'authors': display_author_list(row.authors),
+        'language': row.language,
+        'description': row.description,
+        'word_count': row.word_count,
+        'reading_level': row.reading_level,
+        'primary_genre': row.primary_genre,
+        'secondary_genres': safe_json_loads(row.secondary_genres),
+        **card_tags(row.primary_tag, row.primary_tag_score, row.secondary_tags),
+    }
+    if card['primary_tag'] is None:
+        # Not derived yet: hand the raw columns to _derive_primary_secondary_for_items,
+        # which only looks at topics when there are no tag_scores
+        try:
+            card['tag_scores'] = json_loads(row.tag_scores) if row.tag_scores else []
+        except (ValueError, TypeError):
+            card['tag_scores'] = []
+        if not (isinstance(card['tag_scores'], list) and card['tag_scores']):
+            card['topics'] = safe_json_loads(row.topics)
+    return card
+
+
+# Simple in-memory caches for filters, valid while the book tags version is unchanged
 _CACHES: Dict[str, Dict[str, object]] = {
-    # key: { 'data': Any, 'expires': float }
+    # key: { 'data': Any, 'version': int }
 }
-_CACHE_TTL_SECONDS = 30 * 60  # 30 minutes
+# One lock per cache key so a given list is only ever rebuilt by one thread at a time
+_CACHE_LOCKS: Dict[str, threading.Lock] = {}
+_CACHE_LOCKS_GUARD = threading.Lock()
+
+
+def _cache_lock(key: str) -> threading.Lock:
+    with _CACHE_LOCKS_GUARD:
+        return _CACHE_LOCKS.setdefault(key, threading.Lock())
+
+
+def _cached_by_tags_version(key: str, build: Callable[[], List[str]]) -> List[str]:
+    """Read-through _CACHES[key], rebuilt with build() when the tags version changes.
+
+    A cold cache is built once while concurrent callers wait for it. A stale
+    entry is served as-is while a single background thread rebuilds it.
+    """
+    version = tags_version()
+    entry = _CACHES.get(key)
+    if entry and entry['version'] == version:
+        return entry['data']
+
+    lock = _cache_lock(key)
+    if entry is not None:
+        if lock.acquire(blocking=False):
+            try:
+                app = current_app._get_current_object()
+
+                def _refresh() -> None:
+                    try:
+                        with app.app_context():
+                            _CACHES[key] = {'data': build(), 'version': version}
+                    except Exception as e:
+                        app.logger.warning("Could not refresh %s cache: %s", key, e)
+                    finally:
+                        lock.release()
+
+                threading.Thread(target=_refresh, name=f'cache-refresh-{key}', daemon=True).start()
+            except Exception:
+                lock.release()
+        return entry['data']
+
+    with lock:
+        entry = _CACHES.get(key)
+        if entry and entry['version'] == version:
+            return entry['data']
+        data = build()
+        _CACHES[key] = {'data': data, 'version': version}
+        return data
 
 
 class BookService:
@@ -40,25 +324,16 @@ class BookService:
         return items
     
     @staticmethod
-    def get_books_with_filters(
+    def _filtered_books_query(
         search: str = '',
         language: str = '',
         author: str = '',
-        page: int = 1,
-        per_page: int = 20,
         genres: Optional[List[str]] = None,
         topics: Optional[List[str]] = None,
-    ) -> Tuple[List[Dict], int, int]:
-        """Get books with filters and pagination.
-
-        Push as much filtering to SQL as possible to avoid Python full-table scans.
-        """
+    ):
+        """Build the catalog query for the given filters (no ordering or paging)."""
         query = Book.query
 
-        # Normalize optional list filters
-        selected_genres = [g for g in (genres or []) if g]
-        selected_topics = [t for t in (topics or []) if t]
-
         if search:
             like = f"%{search}%"
             query = query.filter(
@@ -78,130 +353,149 @@ class BookService:
         # Unify filtering by displayed tags (derived from tag_scores or topics fallback)
         # This aligns the catalog filter with the tags shown on book cards
         # AND semantics across all selected tags
-        selected_tags = []
-        if selected_genres:
-            selected_tags.extend([g for g in selected_genres if g])
-        if selected_topics:
-            selected_tags.extend([t for t in selected_topics if t])
-        # Deduplicate while preserving order
-        seen = set()
-        selected_tags = [t for t in selected_tags if not (t in seen or seen.add(t))]
+        # Genres and topics are both tags here; deduplicate while preserving order
+        selected_tags = list(dict.fromkeys(t for t in chain(genres or (), topics or ()) if t))
         if selected_tags:
-            for tag in selected_tags:
-                # Match unified tags primarily via tag_scores JSON, with a fallback to topics JSON
-                # We intentionally do NOT match legacy primary/secondary_genre fields here to avoid
-                # mismatches between displayed tags and filter semantics.
-                query = query.filter(
-                    or_(
-                        # Match a tag object like {"tag":"horror", ...}
-                        Book.tag_scores.like(f'%"tag":"{tag}"%'),
-                        # Fallback: topics list contains the tag
-                        Book.topics.like(f'%"{tag}"%')
-                    )
+            # A book matches when every selected tag is among its displayed tags
+            # (primary + secondaries), as maintained in book_tags
+            matching_ids = (
+                select(BookTag.book_id)
+                .where(
+                    BookTag.tag.in_(bindparam('selected_tags', value=selected_tags, expanding=True)),
+                    _TAG_DISPLAYED,
                 )
+                .group_by(BookTag.book_id)
+                .having(func.count(func.distinct(BookTag.tag)) == len(selected_tags))
+            )
+            query = query.filter(Book.id.in_(matching_ids))
+        return query
 
-        # Refine results if tag filters are present to require displayed tags to match
-        if selected_tags:
-            # Fetch minimal fields for derivation and filter in Python to ensure
-            # the selected tags exist among displayed tags (primary + secondary)
-            candidates = query.with_entities(
-                Book.id, Book.title, Book.tag_scores, Book.topics
-            ).order_by(Book.title).all()
-
-            import json
-            light_items: List[Dict] = []
-            for row in candidates:
-                try:
-                    tag_scores = []
-                    topics_list = []
-                    if row.tag_scores:
-                        try:
-                            tag_scores = json.loads(row.tag_scores) or []
-                        except Exception:
-                            tag_scores = []
-                    if row.topics:
-                        try:
-                            topics_list = json.loads(row.topics) or []
-                        except Exception:
-                            topics_list = []
-                    light_items.append({
-                        'id': row.id,
-                        'title': row.title,
-                        'tag_scores': tag_scores,
-                        'topics': topics_list,
-                    })
-                except Exception:
+    @staticmethod
+    def get_books_with_filters(
+        search: str = '',
+        language: str = '',
+        author: str = '',
+        page: int = 1,
+        per_page: int = 20,
+        genres: Optional[List[str]] = None,
+        topics: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict], int, int]:
+        """Get books with filters and pagination.
+
+        Push as much filtering to SQL as possible to avoid Python full-table scans.
+        Books come in a shuffled order for discovery: the indexed per-book
+        random_key, read from a start point that rotates daily, instead of
+        sorting every matching row by RANDOM() on each request. Only the
+        columns catalog cards render are loaded (see _row_to_card_dict).
+        """
+        query = BookService._filtered_books_query(search, language, author, genres, topics)
+        seed = _discovery_seed()
+
+        total = query.count()
+        pages = (total + per_page - 1) // per_page if per_page > 0 else 1
+        offset = max(0, (page - 1) * per_page)
+
+        # Skip `offset` rows across the segments, then read up to per_page;
+        # a segment is only counted when the page starts past its beginning
+        page_books = []
+        skip = offset
+        for part, order in _catalog_segments(query, seed):
+            remaining = per_page - len(page_books)
+            if remaining <= 0:
+                break
+            if skip:
+                size = part.count()
+                if skip >= size:
+                    skip -= size
                     continue
+            page_books += part.with_entities(*_CARD_COLUMNS).order_by(order).offset(skip).limit(remaining).all()
+            skip = 0
+
+        books = [_row_to_card_dict(row) for row in page_books]
+        # Derive primary/secondary tags from tag_scores
+        BookService._derive_primary_secondary_for_items(books)
+        BookService._attach_tag_labels(books)
+        return books, total, pages
 
-            BookService._derive_primary_secondary_for_items(light_items)
-
-            def displayed_contains_all(item: Dict, tags: List[str]) -> bool:
-                displayed = []
-                if item.get('primary_tag'):
-                    displayed.append(item['primary_tag'])
-                displayed.extend(item.get('secondary_tags') or [])
-                s = set([t for t in displayed if t])
-                return all(t in s for t in tags)
-
-            filtered = [it for it in light_items if displayed_contains_all(it, selected_tags)]
-
-            # Manual pagination after shuffling to randomize discovery
-            import random as _rnd
-            _rnd.shuffle(filtered)
-            total = len(filtered)
-            pages = (total + per_page - 1) // per_page if per_page > 0 else 1
-            start = max(0, (page - 1) * per_page)
-            end = start + per_page
-            page_ids = [it['id'] for it in filtered[start:end]]
-
-            if page_ids:
-                page_books = Book.query.filter(Book.id.in_(page_ids)).all()
-                by_id = {b.id: b for b in page_books}
-                ordered_books = [by_id.get(bid) for bid in page_ids if by_id.get(bid)]
+    @staticmethod
+    def get_books_after_cursor(
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        search: str = '',
+        language: str = '',
+        author: str = '',
+        genres: Optional[List[str]] = None,
+        topics: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Keyset-paginated variant of get_books_with_filters.
+
+        Takes the opaque cursor returned by the previous call (None for the
+        first page) and returns (books, next_cursor); next_cursor is None once
+        all matching books have been returned. Each page is an index range
+        scan on random_key (or id for books without a key yet), however deep
+        the client has scrolled.
+        """
+        # A page of zero (or fewer) books would never move the cursor forward
+        per_page = max(1, per_page)
+        query = BookService._filtered_books_query(search, language, author, genres, topics)
+        seed = _discovery_seed()
+        segment, last_key = _decode_cursor(cursor)
+
+        segments = _catalog_segments(query, seed)
+        page_books = []
+        while segment < len(segments):
+            remaining = per_page - len(page_books)
+            if remaining <= 0:
+                break
+            part, order = segments[segment]
+            if last_key is not None:
+                part = part.filter(order > last_key)
+            rows = part.with_entities(*_CARD_COLUMNS).order_by(order).limit(remaining).all()
+            page_books += rows
+            if len(rows) < remaining:
+                # Segment exhausted: continue with the next one from its start
+                segment, last_key = segment + 1, None
             else:
-                ordered_books = []
+                last_row = rows[-1]
+                last_key = last_row.random_key if segment < 2 else last_row.id
 
-            books = [b.to_dict() for b in ordered_books]
-            BookService._derive_primary_secondary_for_items(books)
-            # Randomize the order of previews to provide a sense of discovery
-            random.shuffle(books)
+        # An empty page means every segment is exhausted: no cursor to hand back
+        if page_books and segment < len(segments):
+            next_cursor = _encode_cursor(segment, last_key)
         else:
-            # Randomize ordering for discovery using SQL RANDOM()
-            books_paginated = query.order_by(text('RANDOM()')).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            next_cursor = None
+
+        books = [_row_to_card_dict(row) for row in page_books]
+        BookService._derive_primary_secondary_for_items(books)
+        BookService._attach_tag_labels(books)
+        return books, next_cursor
 
-            books = [book.to_dict() for book in books_paginated.items]
-            # Derive primary/secondary tags from tag_scores
-            BookService._derive_primary_secondary_for_items(books)
-            total = books_paginated.total
-            pages = books_paginated.pages
+    @staticmethod
+    def _attach_tag_labels(books: List[Dict]) -> None:
+        """Add localized *_label fields for genre and tag keys to each book in-place."""
+        # Set by the before_request hook in app_refactored; 'en' outside a request
         try:
-            from .tag_manager import get_tag_label
-        except Exception:
-            try:
-                from tag_manager import get_tag_label
-            except Exception:
-                get_tag_label = None  # type: ignore
-        if get_tag_label:
-            # Determine language from request context if available
-            try:
-                from flask import request
-                lang = (request.args.get('lang') or request.headers.get('X-Language') or 'en')
-            except Exception:
-                lang = 'en'
-            for b in books:
-                # Legacy genre labels
-                if b.get('primary_genre'):
-                    b['primary_genre_label'] = get_tag_label(b.get('primary_genre'), lang)
-                if isinstance(b.get('secondary_genres'), list):
-                    b['secondary_genres_labels'] = [get_tag_label(g, lang) for g in b.get('secondary_genres')]
-                # Unified tag labels
-                if b.get('primary_tag'):
-                    b['primary_tag_label'] = get_tag_label(b.get('primary_tag'), lang)
-                if isinstance(b.get('secondary_tags'), list):
-                    b['secondary_tags_labels'] = [get_tag_label(t, lang) for t in b.get('secondary_tags')]
-        return books, total, pages
+            lang = g.get('tag_lang', 'en')
+        except RuntimeError:
+            lang = 'en'
+        # One snapshot of the vocabulary labels; other keys (e.g. topics) go through get_tag_label
+        labels = get_tag_labels_map(lang)
+        for b in books:
+            # Legacy genre labels
+            if b.get('primary_genre'):
+                key = b['primary_genre']
+                b['primary_genre_label'] = labels.get(key) or get_tag_label(key, lang)
+            # secondary_* are always lists (to_dict / _derive_primary_secondary_for_items)
+            b['secondary_genres_labels'] = [
+                labels.get(k) or get_tag_label(k, lang) for k in b.get('secondary_genres') or []
+            ]
+            # Unified tag labels
+            if b.get('primary_tag'):
+                key = b['primary_tag']
+                b['primary_tag_label'] = labels.get(key) or get_tag_label(key, lang)
+            b['secondary_tags_labels'] = [
+                labels.get(k) or get_tag_label(k, lang) for k in b.get('secondary_tags') or []
+            ]
     
     @staticmethod
     def _derive_primary_secondary_for_items(items: List[Dict]) -> None:
@@ -209,10 +503,16 @@ class BookService:
 
         - Select the highest-scoring tag as primary if score > 0
         - Select the next 3 highest as secondary
+
+        Book.to_dict already carries these from the columns book_index
+        materializes; only items not derived yet (primary_tag None) are
+        computed here.
         """
         if not items:
             return
         for b in items:
+            if b.get('primary_tag') is not None:
+                continue
             tag_scores = b.get('tag_scores') or []
             if not isinstance(tag_scores, list) or not tag_scores:
                 # Fallback to topics if tag_scores are missing; topics are ordered with primary first
@@ -236,23 +536,26 @@ class BookService:
                     b['secondary_tags_scored'] = []
                 continue
             try:
-                sorted_scores = sorted(
-                    [d for d in tag_scores if isinstance(d, dict) and 'tag' in d],
-                    key=lambda x: float(x.get('score', 0.0)),
-                    reverse=True
-                )
-                non_zero = [d for d in sorted_scores if float(d.get('score', 0.0)) > 0]
-                primary = non_zero[0]['tag'] if non_zero else ''
-                primary_score = float(non_zero[0].get('score', 0.0)) if non_zero else None
+                # Coerce each score once, keep positive ones, then take the top 4 only
+                non_zero = []
+                for d in tag_scores:
+                    if isinstance(d, dict) and 'tag' in d:
+                        score = float(d.get('score', 0.0))
+                        if score > 0:
+                            non_zero.append((score, d))
+                # nlargest keeps the input order between equal scores, like a stable sort
+                top = heapq.nlargest(4, non_zero, key=lambda x: x[0])
+                primary = top[0][1]['tag'] if top else ''
+                primary_score = top[0][0] if top else None
                 # Build secondaries with scores
-                secondaries_dicts = non_zero[1:4] if non_zero else []
-                secondaries = [d['tag'] for d in secondaries_dicts]
+                secondaries_pairs = top[1:4]
+                secondaries = [d['tag'] for _, d in secondaries_pairs]
                 secondaries_scored = [
                     {
                         'tag': str(d.get('tag') or ''),
-                        'score': float(d.get('score', 0.0))
+                        'score': score
                     }
-                    for d in secondaries_dicts
+                    for score, d in secondaries_pairs
                     if d.get('tag')
                 ]
                 b['primary_tag'] = primary
@@ -291,7 +594,11 @@ class BookService:
         """Get a list of random unique books"""
         query = Book.query
         if exclude_ids:
-            query = query.filter(~Book.id.in_(exclude_ids))
+            # One JSON parameter expanded by SQLite's json_each, however long the list
+            excluded = func.json_each(
+                bindparam('exclude_ids', json.dumps([str(i) for i in exclude_ids]))
+            ).table_valued('value')
+            query = query.filter(~Book.id.in_(select(excluded.c.value)))
         books = query.order_by(text('RANDOM()')).limit(limit).all()
         result = [book.to_dict() for book in books]
         BookService._derive_primary_secondary_for_items(result)
@@ -300,78 +607,84 @@ class BookService:
     @staticmethod
     def search_books(query: str, limit: int = 50) -> List[Dict]:
         """Search books in title, authors, and description with character variant insensitivity"""
-        # Normalize the search query
-        normalized_query = normalize_characters(query)
-        
-        # Get all books and filter them in Python for character variant insensitivity
-        all_books = Book.query.all()
-        results = []
-        
-        for book in all_books:
-            # Normalize book fields for comparison
-            normalized_title = normalize_characters(book.title or "")
-            normalized_authors = normalize_characters(book.authors or "")
-            normalized_description = normalize_characters(book.description or "")
-            
-            # Check if normalized query appears in any normalized field
-            if (normalized_query in normalized_title or 
-                normalized_query in normalized_authors or 
-                normalized_query in normalized_description):
-                results.append(book)
-                
-                # Stop if we've reached the limit
-                if len(results) >= limit:
-                    break
-        
-        # Sort by title and return as dictionaries
-        results.sort(key=lambda book: book.title or "")
+        # Normalize the search query once; stored *_norm columns are normalized the same way
+        normalized_query = normalize_for_search((query or '').strip())
+        # A single character would match most of the library; not worth a scan
+        if len(normalized_query) < 2:
+            return []
+        like = f"%{_escape_like(normalized_query)}%"
+        _sync_search_columns()
+
+        results = Book.query.filter(
+            or_(
+                Book.title_norm.like(like, escape='\\'),
+                Book.authors_norm.like(like, escape='\\'),
+                Book.description_norm.like(like, escape='\\'),
+            )
+        ).order_by(Book.title).limit(limit).all()
+
         data = [book.to_dict() for book in results]
         BookService._derive_primary_secondary_for_items(data)
         return data
     
+    @staticmethod
+    def _autocomplete_candidates(column: str, terms: List[str], limit: int, by_author: bool = False) -> list:
+        """Rows (id, title, authors) whose normalized `column` has a word starting with each term.
+
+        Sorted by title, or with `by_author` by author and one row per distinct
+        author list, so the limit caps authors rather than books.
+        """
+        match = f"{{{column}}} : (" + ' '.join(f'"{t}"*' for t in terms) + ")"
+        tail = "GROUP BY b.authors_norm ORDER BY b.authors_norm" if by_author else "ORDER BY b.title"
+        try:
+            return db.session.execute(text(
+                "SELECT b.id, b.title, b.authors FROM books_fts "
+                "JOIN books b ON b.rowid = books_fts.rowid "
+                f"WHERE books_fts MATCH :match {tail} LIMIT :limit"
+            ), {'match': match, 'limit': limit}).all()
+        except Exception:
+            # No FTS5 index (SQLite built without it): substring match on the *_norm column
+            db.session.rollback()
+            col = getattr(Book, column)
+            q = Book.query.with_entities(Book.id, Book.title, Book.authors)
+            for t in terms:
+                q = q.filter(col.like(f"%{_escape_like(t)}%", escape='\\'))
+            if by_author:
+                q = q.group_by(Book.authors_norm).order_by(Book.authors_norm)
+            else:
+                q = q.order_by(Book.title)
+            return q.limit(limit).all()
+
     @staticmethod
     def get_autocomplete_suggestions(query: str, limit: int = 10) -> List[Dict]:
         """Get autocomplete suggestions for search with character variant insensitivity"""
-        # Normalize the search query
-        normalized_query = normalize_characters(query)
-        
-        # Get all books and filter them in Python for character variant insensitivity
-        all_books = Book.query.all()
-        title_matches = []
+        # Normalize the search query; every term must prefix-match a word
+        normalized_query = normalize_for_search((query or '').strip())
+        if len(normalized_query) < 2:
+            return []
+        terms = _SEARCH_TERM_RE.findall(normalized_query)
+        if not terms:
+            return []
+        _sync_search_columns()
+
+        # Titles come back sorted and limited by SQLite
+        title_matches = BookService._autocomplete_candidates('title_norm', terms, limit)
+
+        # One candidate per distinct author list, in normalized author order; a
+        # book can list several authors, so over-fetch before picking names
         author_matches = []
-        
-        for book in all_books:
-            # Normalize book fields for comparison
-            normalized_title = normalize_characters(book.title or "")
-            
-            # Handle authors as JSON string
-            authors_list = []
-            if book.authors:
-                try:
-                    import json
-                    authors_list = json.loads(book.authors)
-                except (json.JSONDecodeError, TypeError):
-                    # If it's not JSON, treat as plain string
-                    authors_list = [book.authors]
-            
-            # Check title matches
-            if normalized_query in normalized_title:
-                title_matches.append(book)
-            
-            # Check author matches
-            for author in authors_list:
-                normalized_author = normalize_characters(str(author))
-                if normalized_query in normalized_author:
-                    author_matches.append((book, author))
+        for book in BookService._autocomplete_candidates('authors_norm', terms, limit * 5, by_author=True):
+            # Pick the author the terms matched
+            for author in _parse_authors(book.authors):
+                author_norm = normalize_for_search(str(author))
+                words = _SEARCH_TERM_RE.findall(author_norm)
+                if all(any(w.startswith(t) for w in words) for t in terms):
+                    author_matches.append((book, author, author_norm))
                     break  # Only add once per book
         
-        # Sort and limit title matches
-        title_matches.sort(key=lambda book: book.title or "")
-        title_matches = title_matches[:limit]
-        
-        # Sort and limit author matches
-        author_matches.sort(key=lambda x: str(x[1]))
-        author_matches = author_matches[:limit]
+        # Keep the first `limit` author matches by normalized name (the candidate order)
+        author_matches = [(book, author) for book, author, _ in
+                          heapq.nsmallest(limit, author_matches, key=lambda x: x[2])]
         
         # Combine and deduplicate results
         suggestions = []
@@ -379,38 +692,14 @@ class BookService:
         seen_authors = set()
         
         # Add title suggestions
-        # Helper to pretty format an author string like "LAST, First" -> "First LAST"
-        def _pretty_author_name(name: str) -> str:
-            pretty = (name or '').strip()
-            if not pretty:
-                return pretty
-            if ',' in pretty:
-                last, first = [part.strip() for part in pretty.split(',', 1)]
-                pretty = f"{first} {last}"
-            # Collapse extra spaces and Title Case for first names, preserve last name capitalization
-            parts = [p for p in pretty.split() if p]
-            if not parts:
-                return pretty
-            if len(parts) == 1:
-                return parts[0].title()
-            first_names = ' '.join(parts[:-1]).title()
-            last_name = parts[-1]
-            return f"{first_names} {last_name}"
-
         for book in title_matches:
             if book.title not in seen_titles:
                 # Derive a readable single-line author string
                 author_text = 'book_details.book_unknown_author'
-                try:
-                    from .models import safe_json_loads  # type: ignore
-                except Exception:
-                    from models import safe_json_loads  # type: ignore
-                raw_list = safe_json_loads(book.authors) if getattr(book, 'authors', None) else []
-                if isinstance(raw_list, list) and raw_list:
+                raw_list = _parse_authors(book.authors)
+                if raw_list:
                     # Pick the first author and format nicely
-                    author_text = _pretty_author_name(str(raw_list[0]))
-                elif isinstance(book.authors, str) and book.authors:
-                    author_text = _pretty_author_name(book.authors)
+                    author_text = _pretty_author_name(raw_list[0])
 
                 suggestions.append({
                     'type': 'title',
@@ -457,66 +746,41 @@ class BookService:
     def get_available_genres() -> List[str]:
         """Get list of available unified tags (used as genres in the UI) with caching.
 
-        Sourced from tag_scores primary/secondary tags with a fallback to topics
-        for books that do not yet have tag_scores. This keeps the filter list
-        consistent with the tags displayed on book cards.
+        Sourced from the displayed tags in book_tags (tag_scores primary/secondary
+        tags, with a fallback to topics for books that do not yet have
+        tag_scores). This keeps the filter list consistent with the tags
+        displayed on book cards, which is what the catalog filter matches.
         """
-        now = time.time()
-        cache = _CACHES.get('genres')
-        if cache and cache['expires'] > now:
-            return cache['data']
-
-        import json
-        tag_set = set()
-        # Scan tag_scores first
-        for row in Book.query.with_entities(Book.tag_scores, Book.topics).all():
-            # tag_scores: JSON array of {"tag": str, "score": float}
-            ts = (row.tag_scores or '').strip() if hasattr(row, 'tag_scores') else ''
-            if ts:
-                try:
-                    for entry in json.loads(ts) or []:
-                        if isinstance(entry, dict):
-                            tag = str(entry.get('tag') or '').strip()
-                            score = float(entry.get('score', 0) or 0)
-                            if tag and score > 0:
-                                tag_set.add(tag)
-                except Exception:
-                    pass
-            # Fallback to topics
-            tops = (row.topics or '').strip() if hasattr(row, 'topics') else ''
-            if tops:
-                try:
-                    for t in json.loads(tops) or []:
-                        t_str = str(t).strip()
-                        if t_str:
-                            tag_set.add(t_str)
-                except Exception:
-                    pass
+        return _cached_by_tags_version('genres', BookService._load_available_genres)
 
-        data = sorted(tag_set, key=lambda s: s.lower())
-        _CACHES['genres'] = { 'data': data, 'expires': now + _CACHE_TTL_SECONDS }
-        return data
+    @staticmethod
+    def _load_available_genres() -> List[str]:
+        tags = db.session.query(BookTag.tag).filter(_TAG_DISPLAYED).distinct()
+        tag_set = {row.tag for row in tags if row.tag}
+
+        return sorted(tag_set, key=lambda s: s.lower())
 
     @staticmethod
     def get_available_topics() -> List[str]:
         """Get list of available topics with simple in-memory caching."""
-        now = time.time()
-        cache = _CACHES.get('topics')
-        if cache and cache['expires'] > now:
-            return cache['data']
+        return _cached_by_tags_version('topics', BookService._load_available_topics)
 
+    @staticmethod
+    def _load_available_topics() -> List[str]:
         topic_set = set()
-        try:
-            from .models import safe_json_loads  # lazy import
-        except Exception:
-            from models import safe_json_loads
         for row in Book.query.with_entities(Book.topics).filter(Book.topics.isnot(None)).all():
-            for t in (safe_json_loads(row.topics) or []):
+            try:
+                topics = json_loads(row.topics)
+                # Plain JSON arrays are the common case; anything else takes the lenient path
+                if not isinstance(topics, list):
+                    raise ValueError
+                topics = [str(t) for t in topics]
+            except (ValueError, TypeError):
+                topics = safe_json_loads(row.topics)
+            for t in topics:
                 if t:
                     topic_set.add(t)
-        data = sorted(topic_set, key=lambda s: s.lower())
-        _CACHES['topics'] = { 'data': data, 'expires': now + _CACHE_TTL_SECONDS }
-        return data
+        return sorted(topic_set, key=lambda s: s.lower())
 
 
 class StatisticsService:
@@ -644,89 +908,153 @@ class RecommendationService:
 
     @staticmethod
     def _derive_primary_secondary_for_items(items: List[Dict]) -> None:
-        """Derive primary and secondary tags from tag_scores for each item in-place.
-
-        - Select the highest-scoring tag as primary if score > 0
-        - Select the next 3 highest as secondary
-        """
-        if not items:
-            return
-        for b in items:
-            tag_scores = b.get('tag_scores') or []
-            if not isinstance(tag_scores, list) or not tag_scores:
-                # Fallback to topics if tag_scores are missing; topics are ordered with primary first
-                topics = b.get('topics') or []
-                if isinstance(topics, list) and topics:
-                    try:
-                        b['primary_tag'] = str(topics[0]) if topics else ''
-                        b['secondary_tags'] = [str(t) for t in topics[1:4]] if len(topics) > 1 else []
-                    except Exception:
-                        b['primary_tag'] = ''
-                        b['secondary_tags'] = []
-                else:
-                    b['primary_tag'] = ''
-                    b['secondary_tags'] = []
-                continue
-            try:
-                sorted_scores = sorted(
-                    [d for d in tag_scores if isinstance(d, dict) and 'tag' in d],
-                    key=lambda x: float(x.get('score', 0.0)),
-                    reverse=True
-                )
-                non_zero = [d for d in sorted_scores if float(d.get('score', 0.0)) > 0]
-                primary = non_zero[0]['tag'] if non_zero else ''
-                secondaries = [d['tag'] for d in non_zero[1:4]] if non_zero else []
-                b['primary_tag'] = primary
-                b['secondary_tags'] = secondaries
-            except Exception:
-                b['primary_tag'] = ''
-                b['secondary_tags'] = []
+        """Derive primary and secondary tags for each item in-place (see BookService)."""
+        BookService._derive_primary_secondary_for_items(items)
 
 
 class CoverService:
-    """Service for book cover handling"""
-    
+    """Service for book cover handling.
+
+    The indexer stores covers base64-encoded in the books table. They are
+    decoded once into a file cache so the cover route can stream them from
+    disk; a re-indexed book (new updated_at) gets a fresh file.
+    """
+
+    _cache_dir: str = os.environ.get('COVER_CACHE_DIR') or str(
+        Path(__file__).resolve().parents[1] / '.cache' / 'covers'
+    )
+
     @staticmethod
     def get_cover_data(book_id: str) -> Optional[Tuple[bytes, str]]:
         """Get book cover data and mime type"""
-        book = Book.query.get(book_id)
-        if not book or not book.cover_data or not book.cover_mime_type:
+        row = db.session.query(Book.cover_data, Book.cover_mime_type).filter(Book.id == book_id).first()
+        if not row or not row.cover_data or not row.cover_mime_type:
             return None
-        
-        import base64
-        image_data = base64.b64decode(book.cover_data)
-        return image_data, book.cover_mime_type
+        return base64.b64decode(row.cover_data), row.cover_mime_type
+
+    @classmethod
+    def get_cover_file(cls, book_id: str) -> Optional[Tuple[str, str]]:
+        """Get the path of the decoded cover file and its mime type, writing it on first use.
+
+        Raises OSError when the cache directory is not writable.
+        """
+        row = db.session.query(Book.cover_mime_type, Book.updated_at).filter(Book.id == book_id).first()
+        if not row or not row.cover_mime_type:
+            return None
+        folder = Path(cls._cache_dir) / hashlib.sha1(book_id.encode('utf-8')).hexdigest()
+        path = folder / hashlib.sha1(str(row.updated_at).encode('utf-8')).hexdigest()[:16]
+        if not path.exists():
+            cover = db.session.query(Book.cover_data).filter(Book.id == book_id).scalar()
+            if not cover:
+                return None
+            folder.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent requests never serve a partial file
+            tmp = folder / f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+            tmp.write_bytes(base64.b64decode(cover))
+            os.replace(tmp, path)
+            # Drop files of earlier versions of this book's cover
+            for old in folder.iterdir():
+                if old.name != path.name and not old.name.endswith('.tmp'):
+                    old.unlink(missing_ok=True)
+        return str(path), row.cover_mime_type
 
 
 class ExternalRatingsService:
     """Fetch external user ratings for books (prototype implementation).
 
-    Uses Google Books API by ISBN with a small in-memory TTL cache to avoid
-    repeated lookups. Returns a simple dict suitable for templates:
+    Uses Google Books API by ISBN with a two-level TTL cache (in-memory in
+    front of an optional on-disk store) to avoid repeated lookups, including
+    for books no API knows about. Returns a simple dict suitable for templates:
     { 'average': float, 'count': int, 'source': str, 'url': str }
     """
 
-    # Simple in-memory cache: { cache_key: (result_dict_or_None, expires_at_epoch) }
+    # In-memory cache: { cache_key: (result_dict_or_None, expires_at_epoch) }
     _cache: Dict[str, Tuple[Optional[Dict], float]] = {}
-    _ttl_seconds: int = 24 * 60 * 60  # 24 hours
+    _ttl_seconds: int = 30 * 24 * 60 * 60  # 30 days for found ratings
+    _negative_ttl_seconds: int = 24 * 60 * 60  # 24 hours for misses
+    _book_ttl_seconds: int = 7 * 24 * 60 * 60  # 7 days for a book's final pick
+    _ttl_jitter: float = 0.1  # up to +10% so entries written together do not expire together
+    _coverage_workers: int = 8  # parallel lookups in ratings_coverage_stats
+    # Persistent cache (diskcache); created lazily, False once it failed to open
+    _disk_cache = None
+    _disk_cache_dir: str = os.environ.get('RATINGS_CACHE_DIR') or str(
+        Path(__file__).resolve().parents[1] / '.cache' / 'ratings'
+    )
+
+    @classmethod
+    def _get_disk_cache(cls):
+        if cls._disk_cache is None:
+            cls._disk_cache = False
+            if _diskcache is not None:
+                try:
+                    cls._disk_cache = _diskcache.Cache(cls._disk_cache_dir)
+                except Exception:
+                    cls._disk_cache = False
+        return cls._disk_cache or None
 
     @classmethod
-    def _get_cached(cls, key: str) -> Optional[Optional[Dict]]:
-        import time
+    def _get_cached(cls, key: str, default=None):
+        """Return the cached value for key (possibly None for a cached miss), else default."""
         entry = cls._cache.get(key)
-        if not entry:
-            return None
-        value, expires_at = entry
-        if expires_at < time.time():
+        if entry:
+            value, expires_at = entry
+            if expires_at >= time.time():
+                return value
             # expired
             cls._cache.pop(key, None)
-            return None
-        return value
+        disk = cls._get_disk_cache()
+        if disk is not None:
+            try:
+                value, expires_at = disk.get(key, default=_UNSET, expire_time=True)
+            except Exception:
+                value, expires_at = _UNSET, None
+            if value is not _UNSET:
+                # Promote to memory for the remaining lifetime of the disk entry
+                cls._cache[key] = (value, expires_at or time.time() + cls._negative_ttl_seconds)
+                return value
+        return default
 
     @classmethod
-    def _set_cached(cls, key: str, value: Optional[Dict]) -> None:
-        import time
-        cls._cache[key] = (value, time.time() + cls._ttl_seconds)
+    def _set_cached(cls, key: str, value: Optional[Dict], ttl: Optional[int] = None) -> None:
+        if ttl is None:
+            ttl = cls._ttl_seconds if value is not None else cls._negative_ttl_seconds
+        ttl = ttl + random.uniform(0, ttl * cls._ttl_jitter)
+        cls._cache[key] = (value, time.time() + ttl)
+        disk = cls._get_disk_cache()
+        if disk is not None:
+            try:
+                disk.set(key, value, expire=ttl)
+            except Exception:
+                pass
+
+    @classmethod
+    def _get_with_cache(cls, cache_key: str, fetcher) -> Optional[Dict]:
+        """Return the cached result for cache_key, calling fetcher only on a cache miss.
+
+        A cached None (the API had no rating) counts as a hit, so known misses
+        are not fetched again until their shorter TTL runs out.
+        """
+        cached_val = cls._get_cached(cache_key, default=_UNSET)
+        if cached_val is not _UNSET:
+            return cached_val
+        result_val = None
+        try:
+            result_val = fetcher()
+        except Exception:
+            result_val = None
+        cls._set_cached(cache_key, result_val)
+        return result_val
+
+    @staticmethod
+    def _normalize_isbn(value: str) -> str:
+        """Normalize ISBN to digits only (keep 10 or 13 length if possible)."""
+        digits = _NON_DIGIT_RE.sub('', str(value or ''))
+        # Prefer 13 if present, else 10, else raw digits
+        if len(digits) >= 13:
+            return digits[-13:]
+        if len(digits) == 10:
+            return digits
+        return digits
 
     @classmethod
     def get_rating_for_book(cls, book: Dict) -> Optional[Dict]:
@@ -746,91 +1074,77 @@ class ExternalRatingsService:
         isbn_raw = (book or {}).get('isbn') or ''
         title = str((book or {}).get('title') or '').strip()
         authors = (book or {}).get('authors') or []
-        language = str((book or {}).get('language') or '').strip().lower()
-
-        # Normalize ISBN to digits only (keep 10 or 13 length if possible)
-        def _normalize_isbn(value: str) -> str:
-            import re as _re
-            digits = ''.join(_re.findall(r'\d', str(value or '')))
-            # Prefer 13 if present, else 10, else raw digits
-            if len(digits) >= 13:
-                return digits[-13:]
-            if len(digits) == 10:
-                return digits
-            return digits
-
-        isbn = _normalize_isbn(isbn_raw)
+        # One code per language so 'English' and 'en' share cache entries
+        language = _normalize_language(str((book or {}).get('language') or ''))
 
-        # Attempt multiple sources, caching each attempt
-        candidates: List[Dict] = []
+        isbn = cls._normalize_isbn(isbn_raw)
 
-        # Helper to fetch with cache wrapper
-        def _get_with_cache(cache_key: str, fetcher):
-            cached_val = cls._get_cached(cache_key)
-            if cached_val is not None:
-                return cached_val
-            result_val = None
+        def _first_author(auths) -> str:
             try:
-                result_val = fetcher()
+                if isinstance(auths, list) and auths:
+                    return str(auths[0])
+                if isinstance(auths, str):
+                    return auths
             except Exception:
-                result_val = None
-            cls._set_cached(cache_key, result_val)
-            return result_val
+                pass
+            return ''
+
+        first_author = _first_author(authors)
+
+        # Cache the final pick per book identity so a known book skips the whole fan-out
+        book_key = f"book:v1:{isbn}|{title.lower()}|{first_author.lower()}|{language}"
+        cached = cls._get_cached(book_key, default=_UNSET)
+        if cached is not _UNSET:
+            return cached
+        result = cls._resolve_rating(isbn, title, first_author, language)
+        cls._set_cached(book_key, result, ttl=cls._book_ttl_seconds if result else None)
+        return result
+
+    @classmethod
+    def _resolve_rating(cls, isbn: str, title: str, first_author: str, language: str) -> Optional[Dict]:
+        """Query every applicable source (each cached) and pick the best rating."""
+        # Attempt multiple sources, caching each attempt
+        candidates: List[Dict] = []
 
         # 1) Google by ISBN
         if isbn:
-            res_g_isbn = _get_with_cache(f"google:isbn:{isbn}", lambda: cls._fetch_google_books_rating_by_isbn(isbn))
+            res_g_isbn = cls._get_with_cache(f"google:v1:isbn:{isbn}", lambda: cls._fetch_google_books_rating_by_isbn(isbn))
             if res_g_isbn:
                 candidates.append(res_g_isbn)
 
         # 2) Open Library by ISBN
         if isbn:
-            res_ol_isbn = _get_with_cache(f"openlibrary:isbn:{isbn}", lambda: cls._fetch_openlibrary_rating_by_isbn(isbn))
+            res_ol_isbn = cls._get_with_cache(f"openlibrary:v1:isbn:{isbn}", lambda: cls._fetch_openlibrary_rating_by_isbn(isbn))
             if res_ol_isbn:
                 candidates.append(res_ol_isbn)
 
         # Title/Author fallback only if we have at least a title
-        def _first_author(auths) -> str:
-            try:
-                if isinstance(auths, list) and auths:
-                    return str(auths[0])
-                if isinstance(auths, str):
-                    return auths
-            except Exception:
-                pass
-            return ''
-
-        first_author = _first_author(authors)
         if title:
             # 3) Google by title+author
-            key = f"google:ta:{title.lower()}::{first_author.lower()}::{language}"
-            res_g_ta = _get_with_cache(key, lambda: cls._fetch_google_books_rating_by_title_author(title, first_author, language))
+            key = f"google:v1:ta:{title.lower()}::{first_author.lower()}::{language}"
+            res_g_ta = cls._get_with_cache(key, lambda: cls._fetch_google_books_rating_by_title_author(title, first_author, language))
             if res_g_ta:
                 candidates.append(res_g_ta)
 
             # 4) Open Library by title+author
-            key2 = f"openlibrary:ta:{title.lower()}::{first_author.lower()}"
-            res_ol_ta = _get_with_cache(key2, lambda: cls._fetch_openlibrary_rating_by_title_author(title, first_author))
+            key2 = f"openlibrary:v1:ta:{title.lower()}::{first_author.lower()}"
+            res_ol_ta = cls._get_with_cache(key2, lambda: cls._fetch_openlibrary_rating_by_title_author(title, first_author))
             if res_ol_ta:
                 candidates.append(res_ol_ta)
 
         if not candidates:
             return None
 
-        # Prefer the result with the largest number of ratings; tie-break on higher average
+        # Prefer the result with the largest number of ratings; tie-break on higher average.
+        # Fetchers already store 'count' as int and 'average' as float.
         def _safe_count(d: Dict) -> int:
-            try:
-                return int(d.get('count') or 0)
-            except Exception:
-                return 0
+            v = d.get('count')
+            return v if isinstance(v, int) else 0
         def _safe_avg(d: Dict) -> float:
-            try:
-                return float(d.get('average') or 0.0)
-            except Exception:
-                return 0.0
+            v = d.get('average')
+            return v if isinstance(v, float) else (float(v) if isinstance(v, int) else 0.0)
 
-        candidates.sort(key=lambda d: (_safe_count(d), _safe_avg(d)), reverse=True)
-        return candidates[0]
+        return max(candidates, key=lambda d: (_safe_count(d), _safe_avg(d)))
 
     @staticmethod
     def _fetch_google_books_rating_by_isbn(isbn: str) -> Optional[Dict]:
@@ -839,7 +1153,6 @@ class ExternalRatingsService:
         Returns None if not found or on error.
         """
         try:
-            import json
             from urllib.parse import quote
             from urllib.request import urlopen, Request
 
@@ -849,37 +1162,104 @@ class ExternalRatingsService:
                 'User-Agent': 'Scriptorium/1.0 (+https://example.local)'
             })
 
-            with urlopen(req, timeout=3) as resp:
+            with _host_slot(req.full_url), urlopen(req, timeout=3) as resp:
                 if resp.status != 200:
                     return None
-                data = json.loads(resp.read().decode('utf-8', errors='ignore'))
+                if _ijson is not None:
+                    # Stream only up to the first volumeInfo; the rest of the body is never parsed
+                    volume_info = next(_ijson.items(resp, 'items.item.volumeInfo', use_float=True), None)
+                else:
+                    data = json_loads(resp.read())
+                    items = (data or {}).get('items') or []
+                    volume_info = (items[0] or {}).get('volumeInfo') if items else None
 
-            items = (data or {}).get('items') or []
-            if not items:
+            if not volume_info:
                 return None
-            volume_info = (items[0] or {}).get('volumeInfo') or {}
-            avg = volume_info.get('averageRating')
-            cnt = volume_info.get('ratingsCount')
-            if avg is None or cnt is None:
-                return None
-            link = volume_info.get('canonicalVolumeLink') or volume_info.get('infoLink') or ''
+            return ExternalRatingsService._google_rating_from_volume_info(volume_info)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _google_rating_from_volume_info(volume_info: Dict) -> Optional[Dict]:
+        """Build a rating dict from a Google Books volumeInfo, or None without ratings."""
+        avg = volume_info.get('averageRating')
+        cnt = volume_info.get('ratingsCount')
+        if avg is None or cnt is None:
+            return None
+        link = volume_info.get('canonicalVolumeLink') or volume_info.get('infoLink') or ''
+        # The API returns JSON numbers; only fall back to guarded coercion otherwise
+        if isinstance(avg, (int, float)):
+            avg_float = float(avg)
+        else:
             try:
                 avg_float = float(avg)
             except Exception:
                 return None
+        if isinstance(cnt, int):
+            cnt_int = cnt
+        else:
             try:
                 cnt_int = int(cnt)
             except Exception:
                 cnt_int = 0
 
-            return {
-                'average': avg_float,
-                'count': cnt_int,
-                'source': 'Google Books',
-                'url': link,
-            }
-        except Exception:
-            return None
+        return {
+            'average': avg_float,
+            'count': cnt_int,
+            'source': 'Google Books',
+            'url': link,
+        }
+
+    @classmethod
+    def _fetch_google_ratings_bulk(cls, isbns: List[str], chunk_size: int = 30) -> Dict[str, Optional[Dict]]:
+        """Fetch Google Books ratings for many normalized ISBNs at once.
+
+        Issues one `isbn:A OR isbn:B ...` volumes query per chunk and maps the
+        returned volumes back to the requested ISBNs through their industry
+        identifiers. Matched ISBNs get an entry, and unmatched ones get None
+        only when the response listed every result. ISBNs of failed or
+        truncated chunks are left out so callers fall back to single lookups.
+        """
+        from urllib.parse import quote
+        from urllib.request import urlopen, Request
+
+        results: Dict[str, Optional[Dict]] = {}
+        unique = list(dict.fromkeys(i for i in isbns if i))
+        for start in range(0, len(unique), chunk_size):
+            chunk = unique[start:start + chunk_size]
+            try:
+                q = '+OR+'.join(f"isbn:{quote(i)}" for i in chunk)
+                url = f"https://www.googleapis.com/books/v1/volumes?q={q}&maxResults=40"
+                req = Request(url, headers={'User-Agent': 'Scriptorium/1.0 (+https://example.local)'})
+                with _host_slot(req.full_url), urlopen(req, timeout=5) as resp:
+                    if resp.status != 200:
+                        continue
+                    data = json_loads(resp.read())
+            except Exception:
+                continue
+
+            wanted = set(chunk)
+            found: Dict[str, Optional[Dict]] = {}
+            items = (data or {}).get('items') or []
+            for it in items:
+                volume_info = (it or {}).get('volumeInfo') or {}
+                for ident in volume_info.get('industryIdentifiers') or []:
+                    isbn = cls._normalize_isbn((ident or {}).get('identifier'))
+                    # Keep the first volume per ISBN, like the single-ISBN lookup
+                    if isbn in wanted and isbn not in found:
+                        found[isbn] = cls._google_rating_from_volume_info(volume_info)
+            # Multi-edition ISBNs can push matches past the single page we read:
+            # unmatched ISBNs are only a known miss when the response was complete
+            try:
+                complete = int((data or {}).get('totalItems') or 0) <= len(items)
+            except (TypeError, ValueError):
+                complete = False
+            for isbn in chunk:
+                if isbn in found:
+                    results[isbn] = found[isbn]
+                elif complete:
+                    results[isbn] = None
+        return results
 
     @staticmethod
     def _fetch_google_books_rating_by_title_author(title: str, author: str, language: str = '') -> Optional[Dict]:
@@ -888,14 +1268,8 @@ class ExternalRatingsService:
         Chooses the best-matching volume by simple similarity on title/author.
         """
         try:
-            import json
             from urllib.parse import quote
             from urllib.request import urlopen, Request
-            from difflib import SequenceMatcher
-
-            def _norm(s: str) -> str:
-                s = (s or '').strip().lower()
-                return ' '.join(''.join(ch for ch in s if ch.isalnum() or ch.isspace()).split())
 
             q_parts = []
             if title:
@@ -904,57 +1278,52 @@ class ExternalRatingsService:
                 q_parts.append(f"inauthor:{author}")
             q = '+'.join(q_parts) if q_parts else quote(title)
             base = f"https://www.googleapis.com/books/v1/volumes?q={quote(q)}"
-            # Restrict by language if a 2-letter code is provided
-            if language and len(language) in (2, 3):
-                base += f"&langRestrict={quote(language)}"
+            # Restrict by language when it maps to a 2-letter code
+            lang2 = _normalize_language(language)
+            if lang2:
+                base += f"&langRestrict={quote(lang2)}"
             req = Request(base, headers={'User-Agent': 'Scriptorium/1.0 (+https://example.local)'})
-            with urlopen(req, timeout=3) as resp:
+            with _host_slot(req.full_url), urlopen(req, timeout=3) as resp:
                 if resp.status != 200:
                     return None
-                data = json.loads(resp.read().decode('utf-8', errors='ignore'))
+                data = json_loads(resp.read())
 
             items = (data or {}).get('items') or []
             if not items:
                 return None
 
-            target_title = _norm(title)
-            target_author = _norm(author)
+            target_title = _norm_text(title)
+            target_author = _norm_text(author)
 
             best = None
             best_score = -1.0
             for it in items:
                 info = (it or {}).get('volumeInfo') or {}
-                g_title = _norm(info.get('title') or '')
-                g_auths = info.get('authors') or []
-                g_first_author = _norm(g_auths[0] if g_auths else '')
-                # Similarity on title and author
-                title_sim = SequenceMatcher(a=target_title, b=g_title).ratio() if target_title and g_title else 0.0
-                author_sim = SequenceMatcher(a=target_author, b=g_first_author).ratio() if target_author and g_first_author else 0.0
-                sim = 0.7 * title_sim + 0.3 * author_sim
-                # Prefer entries that actually have ratings
+                # Prefer entries that actually have ratings; skip before any similarity work
                 if info.get('averageRating') is None or info.get('ratingsCount') is None:
                     continue
+                g_title = _norm_text(info.get('title') or '')
+                # Cheap length gate: titles of wildly different length cannot be a match
+                if abs(len(g_title) - len(target_title)) > max(len(target_title), 8):
+                    continue
+                g_auths = info.get('authors') or []
+                g_first_author = _norm_text(g_auths[0] if g_auths else '')
+                # Exact title and first author is a perfect score: nothing can beat it.
+                # A title-only match still goes through scoring (same-name books).
+                if target_title and g_title == target_title and target_author and g_first_author == target_author:
+                    best = info
+                    break
+                # Similarity on title and author; poor title matches bail out early as 0
+                title_sim = _similarity(target_title, g_title, cutoff=0.5) if target_title and g_title else 0.0
+                author_sim = _similarity(target_author, g_first_author) if target_author and g_first_author else 0.0
+                sim = 0.7 * title_sim + 0.3 * author_sim
                 if sim > best_score:
                     best = info
                     best_score = sim
 
             if not best:
                 return None
-            try:
-                avg_float = float(best.get('averageRating'))
-            except Exception:
-                return None
-            try:
-                cnt_int = int(best.get('ratingsCount'))
-            except Exception:
-                cnt_int = 0
-            link = best.get('canonicalVolumeLink') or best.get('infoLink') or ''
-            return {
-                'average': avg_float,
-                'count': cnt_int,
-                'source': 'Google Books',
-                'url': link,
-            }
+            return ExternalRatingsService._google_rating_from_volume_info(best)
         except Exception:
             return None
 
@@ -965,17 +1334,16 @@ class ExternalRatingsService:
         Returns None if not found or on error.
         """
         try:
-            import json
             from urllib.parse import quote
             from urllib.request import urlopen, Request
 
             # 1) Resolve edition to work key
             url = f"https://openlibrary.org/isbn/{quote(isbn)}.json"
             req = Request(url, headers={'User-Agent': 'Scriptorium/1.0 (+https://example.local)'})
-            with urlopen(req, timeout=3) as resp:
+            with _host_slot(req.full_url), urlopen(req, timeout=3) as resp:
                 if resp.status != 200:
                     return None
-                edition = json.loads(resp.read().decode('utf-8', errors='ignore'))
+                edition = json_loads(resp.read())
             works = (edition or {}).get('works') or []
             if not works:
                 return None
@@ -986,10 +1354,10 @@ class ExternalRatingsService:
             # 2) Fetch ratings for work
             rurl = f"https://openlibrary.org{work_key}/ratings.json"
             rreq = Request(rurl, headers={'User-Agent': 'Scriptorium/1.0 (+https://example.local)'})
-            with urlopen(rreq, timeout=3) as rresp:
+            with _host_slot(rreq.full_url), urlopen(rreq, timeout=3) as rresp:
                 if rresp.status != 200:
                     return None
-                ratings = json.loads(rresp.read().decode('utf-8', errors='ignore'))
+                ratings = json_loads(rresp.read())
             summary = (ratings or {}).get('summary') or {}
             counts = (ratings or {}).get('counts') or {}
             avg = summary.get('average')
@@ -1009,7 +1377,6 @@ class ExternalRatingsService:
     def _fetch_openlibrary_rating_by_title_author(title: str, author: str) -> Optional[Dict]:
         """Fetch ratings from Open Library by searching title/author -> work -> ratings."""
         try:
-            import json
             from urllib.parse import quote
             from urllib.request import urlopen, Request
 
@@ -1019,10 +1386,10 @@ class ExternalRatingsService:
                 q += f"&author={quote(author)}"
             q += "&limit=5"
             req = Request(q, headers={'User-Agent': 'Scriptorium/1.0 (+https://example.local)'})
-            with urlopen(req, timeout=3) as resp:
+            with _host_slot(req.full_url), urlopen(req, timeout=3) as resp:
                 if resp.status != 200:
                     return None
-                data = json.loads(resp.read().decode('utf-8', errors='ignore'))
+                data = json_loads(resp.read())
             docs = (data or {}).get('docs') or []
             if not docs:
                 return None
@@ -1039,10 +1406,10 @@ class ExternalRatingsService:
             # 2) Fetch ratings for work
             rurl = f"https://openlibrary.org{work_key}/ratings.json"
             rreq = Request(rurl, headers={'User-Agent': 'Scriptorium/1.0 (+https://example.local)'})
-            with urlopen(rreq, timeout=3) as rresp:
+            with _host_slot(rreq.full_url), urlopen(rreq, timeout=3) as rresp:
                 if rresp.status != 200:
                     return None
-                ratings = json.loads(rresp.read().decode('utf-8', errors='ignore'))
+                ratings = json_loads(rresp.read())
             summary = (ratings or {}).get('summary') or {}
             counts = (ratings or {}).get('counts') or {}
             avg = summary.get('average')
@@ -1068,27 +1435,48 @@ class ExternalRatingsService:
         try:
             # Lazy import to avoid circular deps
             try:
-                from .models import Book  # type: ignore
+                from .models import Book, display_author_list  # type: ignore
             except Exception:
-                from models import Book  # type: ignore
-
-            total = 0
-            with_isbn = 0
-            found = 0
-            # Query a deterministic sample (by title ordering) to avoid hammering APIs
-            rows = Book.query.order_by(Book.title).limit(max(1, int(sample_limit))).all()
-            for row in rows:
-                total += 1
-                item = row.to_dict()
-                if item.get('isbn'):
-                    with_isbn += 1
-                res = None
+                from models import Book, display_author_list  # type: ignore
+
+            # Query a deterministic sample (by title ordering) to avoid hammering APIs.
+            # Only the columns used for rating lookups are loaded.
+            rows = db.session.query(
+                Book.title, Book.authors, Book.language, Book.isbn
+            ).order_by(Book.title).limit(max(1, int(sample_limit))).all()
+            items = [
+                {
+                    'title': r.title,
+                    'authors': display_author_list(r.authors),
+                    'language': r.language,
+                    'isbn': r.isbn,
+                }
+                for r in rows
+            ]
+
+            # Warm the Google ISBN cache with batched requests instead of one call per book
+            pending = []
+            for item in items:
+                isbn = cls._normalize_isbn(item.get('isbn'))
+                if isbn and cls._get_cached(f"google:v1:isbn:{isbn}", default=_UNSET) is _UNSET:
+                    pending.append(isbn)
+            if pending:
+                for isbn, res in cls._fetch_google_ratings_bulk(pending).items():
+                    cls._set_cached(f"google:v1:isbn:{isbn}", res)
+
+            def _rating_or_none(item: Dict) -> Optional[Dict]:
                 try:
-                    res = cls.get_rating_for_book(item)
+                    return cls.get_rating_for_book(item)
                 except Exception:
-                    res = None
-                if res:
-                    found += 1
+                    return None
+
+            # Lookups are independent and network-bound: overlap them
+            with ThreadPoolExecutor(max_workers=cls._coverage_workers) as ex:
+                results = list(ex.map(_rating_or_none, items))
+
+            total = len(items)
+            with_isbn = sum(1 for item in items if item.get('isbn'))
+            found = sum(1 for res in results if res)
             return { 'total': total, 'with_isbn': with_isbn, 'found': found }
         except Exception:
             return { 'total': 0, 'with_isbn': 0, 'found': 0 }
\ No newline at end of file
@@ -13,6 +13,7 @@ Both mappings are optional; sensible fallbacks are used if unavailable.
 from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, Optional, List
 
@@ -25,6 +26,18 @@ except Exception:  # pragma: no cover
     ]
 
 
+LANGUAGES = ('en', 'fr')
+
+# Special-case common tags for nicer presentation than the derived label
+SPECIAL_LABELS: Dict[str, Dict[str, str]] = {
+    'science-fiction': {'en': 'Science Fiction', 'fr': 'Science-fiction'},
+    'magical-realism': {'en': 'Magical Realism', 'fr': 'Réalisme magique'},
+    'alternate-history': {'en': 'Alternate History', 'fr': 'Histoire alternative'},
+    'coming-of-age': {'en': "Coming of Age", 'fr': "Passage à l'âge adulte"},
+    'true-crime': {'en': 'True Crime', 'fr': 'True crime'},
+}
+
+
 class TagManager:
     def __init__(self,
                  project_root: Optional[Path] = None,
@@ -37,10 +50,15 @@ class TagManager:
         self._tag_sets: Dict[str, Dict] = {}
         self._labels: Dict[str, Dict[str, str]] = {}
         self._colors: Dict[str, str] = {}
+        # Final label per language and key, see _resolve_labels()
+        self._resolved: Dict[str, Dict[str, str]] = {}
+        # get_labels_for_language() result per language, see _resolve_labels()
+        self._language_labels: Dict[str, Dict[str, str]] = {}
 
         self._load_tag_sets()
         self._load_labels()
         self._load_colors()
+        self._resolve_labels()
 
     def _load_json(self, path: Path) -> Dict:
         try:
@@ -75,6 +93,36 @@ class TagManager:
         if isinstance(data, dict):
             self._colors = {str(k): str(v) for k, v in data.items()}
 
+    def _resolve_labels(self) -> None:
+        # Precompute the label of every known key so get_label is a dict lookup
+        keys = set(DEFAULT_TAG_KEYS) | set(SPECIAL_LABELS)
+        for tag_set in self._tag_sets.values():
+            keys.update(str(k) for k in tag_set)
+        for mapping in self._labels.values():
+            keys.update(mapping)
+        self._resolved = {
+            lang: {sys.intern(k): self._compute_label(k, lang) for k in keys}
+            for lang in LANGUAGES
+        }
+        # Use EN tag set as authoritative for keys; if empty, use default
+        set_keys = set(self._tag_sets.get('en', {}).keys()) or set(DEFAULT_TAG_KEYS)
+        if not set_keys:
+            # Fallback to FR keys if EN missing
+            set_keys = set(self._tag_sets.get('fr', {}).keys())
+        self._language_labels = {
+            lang: {k: self._resolved[lang][k] for k in sorted(set_keys)}
+            for lang in LANGUAGES
+        }
+
+    def _compute_label(self, key: str, lang: str) -> str:
+        # Prefer explicit mapping if available
+        if lang in self._labels and key in self._labels[lang]:
+            return self._labels[lang][key]
+        if key in SPECIAL_LABELS:
+            return SPECIAL_LABELS[key].get(lang, SPECIAL_LABELS[key]['en'])
+        # Fallback: derive human label from key, title case reasonable default
+        return key.replace('-', ' ').strip().title()
+
     def reload(self) -> None:
         self._tag_sets.clear()
         self._labels.clear()
@@ -82,31 +130,19 @@ class TagManager:
         self._load_tag_sets()
         self._load_labels()
         self._load_colors()
+        self._resolve_labels()
 
     def get_label(self, tag_key: Optional[str], language: str = 'en') -> str:
         if not tag_key:
             return ''
         key = str(tag_key)
-
-        # Prefer explicit mapping if available
         lang = 'fr' if (language or 'en').startswith('fr') else 'en'
-        if lang in self._labels and key in self._labels[lang]:
-            return self._labels[lang][key]
-
-        # Fallback: derive human label from key
-        derived = key.replace('-', ' ').strip()
-        # Special-case common tags for nicer presentation
-        special = {
-            'science-fiction': {'en': 'Science Fiction', 'fr': 'Science-fiction'},
-            'magical-realism': {'en': 'Magical Realism', 'fr': 'Réalisme magique'},
-            'alternate-history': {'en': 'Alternate History', 'fr': 'Histoire alternative'},
-            'coming-of-age': {'en': "Coming of Age", 'fr': "Passage à l'âge adulte"},
-            'true-crime': {'en': 'True Crime', 'fr': 'True crime'},
-        }
-        if key in special:
-            return special[key].get(lang, special[key]['en'])
-        # Title case reasonable default
-        return derived.title()
+        label = self._resolved[lang].get(key)
+        if label is None:
+            # Keys outside the vocabulary (free-form topics, unvalidated ?genre=
+            # values) are derived on each call, not stored: the table stays bounded
+            label = self._compute_label(key, lang)
+        return label
 
     def get_color_class(self, tag_key: Optional[str]) -> str:
         if not tag_key:
@@ -114,17 +150,10 @@ class TagManager:
         return self._colors.get(str(tag_key), 'bg-secondary')
 
     def get_labels_for_language(self, language: str = 'en') -> Dict[str, str]:
-        # Return a complete mapping, falling back to derived labels for missing entries
+        # Complete mapping for the tag set, built once per (re)load; shared, so
+        # callers that add entries must copy it first
         lang = 'fr' if (language or 'en').startswith('fr') else 'en'
-        # Use EN tag set as authoritative for keys; if empty, use default
-        keys = set(self._tag_sets.get('en', {}).keys()) or set(DEFAULT_TAG_KEYS)
-        if not keys:
-            # Fallback to FR keys if EN missing
-            keys = set(self._tag_sets.get('fr', {}).keys())
-        result: Dict[str, str] = {}
-        for k in sorted(keys):
-            result[k] = self.get_label(k, lang)
-        return result
+        return self._language_labels[lang]
 
     def get_colors(self) -> Dict[str, str]:
         return dict(self._colors)
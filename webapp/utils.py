@@ -3,7 +3,10 @@ Utility functions for the library webapp
 """
 
 import json
+import re
+import sys
 import unicodedata
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import time
@@ -12,31 +15,63 @@ from sqlalchemy import text
 from flask import current_app
 
 try:
-    from .models import db, Book
-except ImportError:
-    from models import db, Book
+    from .tag_manager import get_tag_color_class as _get_tag_color_class
+except Exception:
+    try:
+        from tag_manager import get_tag_color_class as _get_tag_color_class
+    except Exception:
+        _get_tag_color_class = None  # type: ignore
+
+try:
+    # orjson is a drop-in, much faster parser (str or bytes) for the JSON-encoded
+    # columns and API responses; shared by models, book_index and services
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    json_loads = json.loads
 
 
-def normalize_characters(text: str) -> str:
+@lru_cache(maxsize=None)
+def _combining_re() -> 're.Pattern[str]':
+    """Character class matching every combining mark; compiled on first use.
+
+    Combining marks (non-zero canonical combining class) all live in
+    planes 0 and 1, so only those are scanned.
     """
-    Normalize characters to handle diacritics and character variants.
-    For example, 'a' will match 'a', 'â', 'ä', 'à', etc.
+    ranges = []
+    for cp in range(0x20000):
+        if unicodedata.combining(chr(cp)):
+            if ranges and ranges[-1][1] == cp - 1:
+                ranges[-1][1] = cp
+            else:
+                ranges.append([cp, cp])
+    return re.compile('[' + ''.join(f'\\U{lo:08x}-\\U{hi:08x}' for lo, hi in ranges) + ']')
+
+
+# Strings up to this length (queries, names, tags, titles) go through the
+# memoised path; longer ones such as descriptions are rarely repeated
+_NORMALIZE_CACHE_MAX_LEN = 256
+
+
+def normalize_for_search(text: str) -> str:
+    """
+    Fold text for search matching: compatibility forms (NFKD: fullwidth
+    letters, ligatures, superscripts), case (casefold: 'ß' -> 'ss') and
+    diacritics. Used for both the indexed *_norm columns and queries.
     """
     if not text:
         return ""
-    
-    # Normalize unicode characters (NFD = Canonical Decomposition)
-    # This separates base characters from their diacritical marks
-    normalized = unicodedata.normalize('NFD', text.lower())
-    
-    # Remove diacritical marks (combining characters)
-    # This keeps only the base characters
-    cleaned = ''.join(
-        char for char in normalized 
-        if not unicodedata.combining(char)
-    )
-    
-    return cleaned
+    if len(text) <= _NORMALIZE_CACHE_MAX_LEN:
+        return _normalize_for_search_cached(text)
+    return _normalize_for_search(text)
+
+
+def _normalize_for_search(text: str) -> str:
+    if text.isascii():
+        return text.casefold()
+    return _combining_re().sub('', unicodedata.normalize('NFKD', text).casefold())
+
+
+_normalize_for_search_cached = lru_cache(maxsize=4096)(_normalize_for_search)
 
 
 def calculate_reading_time(word_count: Optional[int], words_per_minute: int = 200) -> Optional[str]:
@@ -44,12 +79,12 @@ def calculate_reading_time(word_count: Optional[int], words_per_minute: int = 20
     if not word_count:
         return None
     
-    minutes = word_count / words_per_minute
+    # Whole minutes, integer arithmetic throughout
+    minutes = int(word_count) // words_per_minute
     if minutes < 60:
-        return f"{int(minutes)} min"
+        return f"{minutes} min"
     else:
-        hours = int(minutes // 60)
-        remaining_minutes = int(minutes % 60)
+        hours, remaining_minutes = divmod(minutes, 60)
         if remaining_minutes == 0:
             return f"{hours}h"
         else:
@@ -65,125 +100,140 @@ def truncate_html(text: str, length: int = 150) -> str:
     if len(text) <= length:
         return text
     
-    # Simple truncation - in a real app you might want to use a proper HTML parser
-    # This is a basic implementation that just truncates at the character level
     truncated = text[:length]
     
-    # Try to close any open tags by finding the last complete tag
+    # Unclosed tag at the cut: prefer the last space before it when it is in
+    # the last 20%, otherwise cut just before the tag (never emit half a tag).
+    # Each search only covers the part of the prefix that can change the
+    # answer: plain text stops after one scan, and '>' is only looked for
+    # after the last '<'.
     last_tag_start = truncated.rfind('<')
-    last_tag_end = truncated.rfind('>')
-    
-    if last_tag_start > last_tag_end:
-        # We have an unclosed tag, try to find a good cutoff point
-        # Look for the last space before the unclosed tag
-        last_space = truncated.rfind(' ', 0, last_tag_start)
-        if last_space > length * 0.8:  # If we can find a space in the last 20%
-            truncated = truncated[:last_space]
-        else:
-            # Just truncate and add ellipsis
-            truncated = truncated[:length-3] + "..."
-    else:
-        truncated += "..."
+    if last_tag_start != -1 and truncated.find('>', last_tag_start) == -1:
+        last_space = truncated.rfind(' ', int(length * 0.8) + 1, last_tag_start)
+        if last_space != -1:
+            return truncated[:last_space]
+        return truncated[:last_tag_start] + "..."
     
-    return truncated
+    return truncated + "..."
 
 
 def get_genre_color(genre: str) -> str:
     """Get color class for a genre or v2 tag via TagManager mapping."""
-    if not genre:
+    if not genre or _get_tag_color_class is None:
         return 'bg-secondary'
-    try:
-        from .tag_manager import get_tag_color_class
-    except Exception:
-        try:
-            from tag_manager import get_tag_color_class
-        except Exception:
-            get_tag_color_class = None  # type: ignore
-    if get_tag_color_class:
-        return get_tag_color_class(genre)
-    return 'bg-secondary'
+    return _get_tag_color_class(genre)
+
+
+# Column order of a books row, as returned by row_to_dict
+_ROW_KEYS = (
+    'id', 'title', 'authors', 'language', 'publisher', 'publication_date', 'isbn',
+    'description', 'subjects', 'file_path', 'file_size', 'word_count', 'character_count',
+    'paragraph_count', 'sentence_count', 'average_sentence_length', 'average_word_length',
+    'created_at', 'primary_genre', 'primary_confidence', 'secondary_genres',
+    'secondary_confidences', 'complexity_level', 'reading_level', 'topics', 'keywords',
+)
+
+# Positions of the JSON-encoded list columns (authors, subjects, ..., keywords)
+_JSON_COLUMNS = (2, 8, 20, 21, 24, 25)
+
+# Low-cardinality text columns (language, primary_genre, complexity_level,
+# reading_level): interned so converted rows share one object per value
+_INTERNED_COLUMNS = (3, 18, 22, 23)
+
+
+def _row_values(row) -> List[Any]:
+    """Row values in _ROW_KEYS order with the JSON columns parsed"""
+    width = len(_ROW_KEYS)
+    # Rows from older schemas stop after created_at (18 columns); the missing
+    # classification columns are padded with None (parsed as [] for lists)
+    n = len(row)
+    values = list(row[:width]) if n >= width else list(row) + [None] * (width - n)
+    for i in _JSON_COLUMNS:
+        values[i] = safe_json_loads(values[i])
+    for i in _INTERNED_COLUMNS:
+        if type(values[i]) is str:
+            values[i] = sys.intern(values[i])
+    return values
 
 
 def row_to_dict(row) -> Dict[str, Any]:
     """Convert database row to dictionary with proper author parsing"""
-    return {
-        'id': row[0],
-        'title': row[1],
-        'authors': safe_json_loads(row[2]),
-        'language': row[3],
-        'publisher': row[4],
-        'publication_date': row[5],
-        'isbn': row[6],
-        'description': row[7],
-        'subjects': safe_json_loads(row[8]),
-        'file_path': row[9],
-        'file_size': row[10],
-        'word_count': row[11],
-        'character_count': row[12],
-        'paragraph_count': row[13],
-        'sentence_count': row[14],
-        'average_sentence_length': row[15],
-        'average_word_length': row[16],
-        'created_at': row[17],
-        'primary_genre': row[18] if len(row) > 18 else None,
-        'primary_confidence': row[19] if len(row) > 19 else None,
-        'secondary_genres': safe_json_loads(row[20]) if len(row) > 20 else [],
-        'secondary_confidences': safe_json_loads(row[21]) if len(row) > 21 else [],
-        'complexity_level': row[22] if len(row) > 22 else None,
-        'reading_level': row[23] if len(row) > 23 else None,
-        'topics': safe_json_loads(row[24]) if len(row) > 24 else [],
-        'keywords': safe_json_loads(row[25]) if len(row) > 25 else []
-    }
+    return dict(zip(_ROW_KEYS, _row_values(row)))
 
 
 def safe_json_loads(value):
     """Safely parse JSON string to list"""
-    if not value:
+    if not value or value == '[]':
         return []
+    if isinstance(value, (str, bytes)):
+        # Fresh list per call: callers may mutate it, the cached tuple stays intact
+        return list(_parse_json_cached(value))
+    return _parse_json(value)
+
+
+@lru_cache(maxsize=8192)
+def _parse_json_cached(value) -> tuple:
+    # The same blobs (e.g. '["Fiction"]') recur across thousands of rows
+    return tuple(_parse_json(value))
+
+
+# First characters a JSON document can start with (after whitespace)
+_JSON_START = frozenset('[{"-0123456789tfnNI')
+
+# Returned by _try_json_loads when the value is not valid JSON
+_NOT_JSON = object()
+
+
+def _try_json_loads(value):
     try:
-        # First, try to parse as regular JSON
-        parsed = json.loads(value)
-        if isinstance(parsed, list):
-            # Handle case where list contains single string with dash separator
-            result = []
-            for item in parsed:
-                if isinstance(item, str) and ' - ' in item:
-                    # Split by dash separator and clean up
-                    authors = [author.strip() for author in item.split(' - ')]
-                    result.extend(authors)
-                else:
-                    result.append(str(item))
-            return result
-        else:
-            # Special case: if the parsed value is exactly "[]", return empty list
-            if str(parsed) == '[]':
-                return []
-            return [str(parsed)]
+        return json_loads(value)
     except (json.JSONDecodeError, TypeError):
-        # If that fails, try to parse as a double-quoted JSON string
-        try:
-            # Remove outer quotes if they exist
-            cleaned_value = value.strip()
-            if cleaned_value.startswith('"') and cleaned_value.endswith('"'):
-                cleaned_value = cleaned_value[1:-1]
-                # Unescape the inner JSON
-                cleaned_value = cleaned_value.replace('\\"', '"')
-                parsed = json.loads(cleaned_value)
-                if isinstance(parsed, list):
-                    return [str(item) for item in parsed]
-                else:
-                    return [str(parsed)]
-        except (json.JSONDecodeError, TypeError):
-            pass
-        
-        # If all parsing fails, treat as a single string
-        # But don't treat empty strings or "[]" as single strings
-        if value == '[]' or value == '"[]"':
-            return []
-        # Also handle the case where the value is just a string representation of an empty array
-        if str(value).strip() in ['[]', '"[]"']:
-            return []
-        # Special case: if the value is exactly "[]" (double-quoted empty array), return empty list
-        if str(value).strip() == '"[]"':
+        return _NOT_JSON
+
+
+def _parse_json(value) -> List[str]:
+    # Plain text such as a bare author name cannot be JSON: skip the parser
+    # (and the exception it would raise)
+    if isinstance(value, str) and value.lstrip()[:1] not in _JSON_START:
+        parsed = _NOT_JSON
+    else:
+        parsed = _try_json_loads(value)
+
+    if isinstance(parsed, list):
+        # Common case: no dash-separated authors anywhere in the raw text
+        # (a \u escape could still spell one out, so those take the slow path)
+        if isinstance(value, str) and ' - ' not in value and '\\u' not in value:
+            if all(type(item) is str for item in parsed):
+                return parsed
+            return [str(item) for item in parsed]
+        # Handle case where list contains single string with dash separator
+        result = []
+        for item in parsed:
+            if isinstance(item, str) and ' - ' in item:
+                # Split by dash separator and clean up
+                authors = [author.strip() for author in item.split(' - ')]
+                result.extend(authors)
+            else:
+                result.append(str(item))
+        return result
+    if parsed is not _NOT_JSON:
+        # Special case: if the parsed value is exactly "[]", return empty list
+        if str(parsed) == '[]':
             return []
-        return [str(value)] if value else []
+        return [str(parsed)]
+
+    # Not JSON: maybe a double-quoted JSON string with unescaped inner quotes
+    cleaned_value = value.strip() if isinstance(value, str) else ''
+    if cleaned_value.startswith('"') and cleaned_value.endswith('"'):
+        # Remove outer quotes and unescape the inner JSON
+        parsed = _try_json_loads(cleaned_value[1:-1].replace('\\"', '"'))
+        if isinstance(parsed, list):
+            return [str(item) for item in parsed]
+        if parsed is not _NOT_JSON:
+            return [str(parsed)]
+
+    # If all parsing fails, treat as a single string
+    # But don't treat empty strings or "[]" as single strings
+    if str(value).strip() in ('[]', '"[]"'):
+        return []
+    return [str(value)] if value else []
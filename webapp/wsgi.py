@@ -2,13 +2,24 @@
 WSGI entrypoint for production servers.
 
 Exposes `application` for WSGI servers like Gunicorn/Waitress.
+
+The app is built at import time. Run Gunicorn with `--preload` so it is
+built once in the master process and every worker forks from it (shared
+copy-on-write pages, no per-worker startup); the worker count comes from
+`WEB_CONCURRENCY`, which Gunicorn reads natively.
 """
 
 from .app_refactored import create_app
+from .models import db
 
 # Use production config by default in WSGI context
 application = create_app('production')
 
+# Startup (the book index sync) leaves a pooled SQLite connection open; close
+# it so preloaded workers each open their own instead of sharing the parent's
+with application.app_context():
+    db.engine.dispose()
+
 # Optional: allow `python -m webapp.wsgi` to run locally
 if __name__ == '__main__':
     application.run(host=application.config.get('HOST', '0.0.0.0'),